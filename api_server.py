@@ -0,0 +1,416 @@
+"""
+HTTP/JSON API for the school management system, so several clerks can work at once.
+
+    python api_server.py --port 8000
+    curl -X POST localhost:8000/students -d '{"name": "Ada Lovelace", "class_name": "7A"}'
+    curl 'localhost:8000/students/search?q=ada'
+
+Requests are handled by asyncio. Reads run on a bounded thread pool, each on a pooled read-only
+connection, and writes are queued to a single group commit writer (group_commit.py) that owns
+the only read-write connection, so SQLite never sees two writers at once and concurrent writes
+share one commit. GET /health includes the writer's throughput and latency counters.
+
+Endpoints (list endpoints take ?after=<id>&limit=<rows> and return rows plus next_after):
+
+    GET    /students                     POST   /students             {name, class_name?}
+    GET    /students/search?q=           GET    /students/<id>
+    PATCH  /students/<id> {name?, class_name?}
+    DELETE /students/<id>
+    GET    /students/<id>/grades         GET    /students/<id>/attendance
+    GET    /grades                       POST   /grades               {student_id, subject, grade}
+    GET    /attendance                   POST   /attendance           {student_id, present, date?}
+    GET    /classes                      POST   /classes              {class_name, grade_level}
+    GET    /classes/<id>/students        POST   /classes/<id>/students {student_id}
+    POST   /classes/<id>/roll-call {absent: [ids], date?}
+    GET    /health
+"""
+import argparse
+import asyncio
+import json
+import re
+import signal
+import sqlite3
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+import lookup_cache
+from db import DB_PATH, connect
+from group_commit import GroupCommitWriter
+from migrations import migrate
+from pager import PAGE_SIZE
+from read_pool import ReadPool
+from repository import AttendanceRepo, ClassRepo, GradeRepo, NotFoundError, RepositoryError, StudentRepo
+
+READ_WORKERS = 8  # Threads (and read-only connections) serving GET requests
+WRITE_QUEUE_SIZE = 1000  # Writes waiting for the writer before clients are made to wait
+MAX_PAGE_SIZE = 1000  # Largest ?limit= a list endpoint accepts
+MAX_BODY = 1 << 20  # Largest request body accepted, in bytes
+LISTEN_BACKLOG = 1024  # Pending connections the OS queues for us
+
+Request = namedtuple("Request", "ids query body")
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _field(body, name, convert=None):
+    if name not in body:
+        raise HTTPError(400, f"Missing field '{name}'.")
+    try:
+        return convert(body[name]) if convert else body[name]
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"Invalid value for '{name}'.") from None
+
+
+def _optional_field(body, name, convert=None):
+    # Like _field, but a missing or null field is None
+    return None if body.get(name) is None else _field(body, name, convert)
+
+
+def _text(value):
+    if not isinstance(value, str):
+        raise TypeError(f"expected a string, got {type(value).__name__}")
+    if not value.strip():
+        raise ValueError("expected a non-empty string")
+    return value
+
+
+def _integer(value):
+    # JSON true/false arrive as bool, a subclass of int
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise TypeError(f"expected an integer, got {type(value).__name__}")
+    return value
+
+
+def _boolean(value):
+    if not isinstance(value, bool):
+        raise TypeError(f"expected true or false, got {type(value).__name__}")
+    return value
+
+
+def _integers(value):
+    if not isinstance(value, list):
+        raise TypeError(f"expected a list, got {type(value).__name__}")
+    return [_integer(item) for item in value]
+
+
+def _int_param(query, name, default=None):
+    if name not in query:
+        return default
+    try:
+        return int(query[name])
+    except ValueError:
+        raise HTTPError(400, f"Query parameter '{name}' must be an integer.") from None
+
+
+def _rows(columns, rows):
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def _page(fetch, columns, request):
+    limit = min(max(_int_param(request.query, "limit", PAGE_SIZE), 1), MAX_PAGE_SIZE)
+    rows = fetch(after=_int_param(request.query, "after"), limit=limit)
+    return {"rows": _rows(columns, rows), "next_after": rows[-1][0] if len(rows) == limit else None}
+
+
+# Students
+
+def list_students(conn, request):
+    return _page(StudentRepo(conn).page_with_classes, ("id", "name", "class_name"), request)
+
+
+def search_students(conn, request):
+    term = request.query.get("q", "")
+    if not term:
+        raise HTTPError(400, "Query parameter 'q' is required.")
+    limit = min(max(_int_param(request.query, "limit", 50), 1), MAX_PAGE_SIZE)
+    return {"rows": _rows(("id", "name", "class_name"), StudentRepo(conn).search(term, limit))}
+
+
+def get_student(conn, request):
+    student = StudentRepo(conn).require(request.ids[0])
+    classes = ClassRepo(conn).for_student(student[0])
+    return dict(_rows(("id", "name", "registration_date"), [student])[0],
+                classes=_rows(("id", "class_name", "grade_level"), classes))
+
+
+def student_grades(conn, request):
+    StudentRepo(conn).require(request.ids[0])
+    return {"rows": _rows(("id", "subject", "grade"), GradeRepo(conn).for_student(request.ids[0]))}
+
+
+def student_attendance(conn, request):
+    StudentRepo(conn).require(request.ids[0])
+    return {"rows": _rows(("date", "present"), AttendanceRepo(conn).for_student(request.ids[0]))}
+
+
+def add_student(conn, request):
+    student_id = StudentRepo(conn).add(_field(request.body, "name", _text), _optional_field(request.body, "class_name", _text))
+    return {"id": student_id}
+
+
+def update_student(conn, request):
+    student_id = request.ids[0]
+    students = StudentRepo(conn)
+    students.require(student_id)
+    name = _optional_field(request.body, "name", _text)
+    class_name = _optional_field(request.body, "class_name", _text)
+    if name:
+        students.rename(student_id, name)
+    if class_name:
+        classes = ClassRepo(conn)
+        classes.assign(student_id, classes.require_by_name(class_name)[0], replace=True)
+    return {"id": student_id}
+
+
+def delete_student(conn, request):
+    StudentRepo(conn).delete(request.ids[0])
+    return {"id": request.ids[0]}
+
+
+# Grades and attendance
+
+def list_grades(conn, request):
+    return _page(GradeRepo(conn).page, ("id", "name", "subject", "grade"), request)
+
+
+def add_grade(conn, request):
+    grade_id = GradeRepo(conn).add(_field(request.body, "student_id", _integer), _field(request.body, "subject", _text),
+                                   _field(request.body, "grade", _integer))
+    return {"id": grade_id}
+
+
+def list_attendance(conn, request):
+    return _page(AttendanceRepo(conn).page, ("id", "name", "date", "present"), request)
+
+
+def add_attendance(conn, request):
+    student_id = _field(request.body, "student_id", _integer)
+    present = _field(request.body, "present", _boolean) if "present" in request.body else True
+    attendance_date = AttendanceRepo(conn).record(student_id, present, _optional_field(request.body, "date", _text))
+    return {"student_id": student_id, "date": attendance_date, "present": present}
+
+
+# Classes
+
+def list_classes(conn, request):
+    return _page(ClassRepo(conn).page, ("id", "class_name", "grade_level"), request)
+
+
+def add_class(conn, request):
+    class_id = ClassRepo(conn).add(_field(request.body, "class_name", _text), _field(request.body, "grade_level", _integer))
+    return {"id": class_id}
+
+
+def class_roster(conn, request):
+    return {"rows": _rows(("id", "name"), ClassRepo(conn).roster(request.ids[0]))}
+
+
+def assign_student(conn, request):
+    student_id = _field(request.body, "student_id", _integer)
+    ClassRepo(conn).assign(student_id, request.ids[0])
+    return {"student_id": student_id, "class_id": request.ids[0]}
+
+
+def roll_call(conn, request):
+    absent_ids = _field(request.body, "absent", _integers)
+    present, absent = AttendanceRepo(conn).roll_call(request.ids[0], absent_ids,
+                                                     _optional_field(request.body, "date", _text))
+    return {"class_id": request.ids[0], "present": present, "absent": absent}
+
+
+# (method, path pattern, handler, is a write); numeric path segments become Request.ids
+ROUTES = [
+    ("GET", r"/students", list_students, False),
+    ("POST", r"/students", add_student, True),
+    ("GET", r"/students/search", search_students, False),
+    ("GET", r"/students/(\d+)", get_student, False),
+    ("PATCH", r"/students/(\d+)", update_student, True),
+    ("DELETE", r"/students/(\d+)", delete_student, True),
+    ("GET", r"/students/(\d+)/grades", student_grades, False),
+    ("GET", r"/students/(\d+)/attendance", student_attendance, False),
+    ("GET", r"/grades", list_grades, False),
+    ("POST", r"/grades", add_grade, True),
+    ("GET", r"/attendance", list_attendance, False),
+    ("POST", r"/attendance", add_attendance, True),
+    ("GET", r"/classes", list_classes, False),
+    ("POST", r"/classes", add_class, True),
+    ("GET", r"/classes/(\d+)/students", class_roster, False),
+    ("POST", r"/classes/(\d+)/students", assign_student, True),
+    ("POST", r"/classes/(\d+)/roll-call", roll_call, True),
+]
+_ROUTES = [(method, re.compile(f"{pattern}/?"), handler, write) for method, pattern, handler, write in ROUTES]
+
+
+class APIServer:
+    """
+    Routes HTTP requests to the handlers above: reads on the thread pool, writes through the group commit writer.
+    """
+
+    def __init__(self, path=None, read_workers=READ_WORKERS, write_queue_size=WRITE_QUEUE_SIZE):
+        self.path = path or DB_PATH
+        self.read_workers = read_workers
+        self.write_queue_size = write_queue_size
+        self.requests = 0
+
+    async def start(self, host, port):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._migrate)
+        # One thread owns the read-write connection and commits queued writes in groups
+        self.writer = await loop.run_in_executor(None, GroupCommitWriter(self.path, queue_size=self.write_queue_size).start)
+        self._write_slots = asyncio.Semaphore(self.write_queue_size)
+        self._readers = ThreadPoolExecutor(max_workers=self.read_workers, thread_name_prefix="sms-reader")
+        self.pool = ReadPool(self.path, size=self.read_workers)
+        self.server = await asyncio.start_server(self._client, host, port, backlog=LISTEN_BACKLOG)
+        return self.server
+
+    def _migrate(self):
+        conn = connect(self.path)
+        migrate(conn)
+        conn.close()
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+        await asyncio.get_running_loop().run_in_executor(None, self.writer.close)
+        self._readers.shutdown()
+        self.pool.close()
+
+    def _read(self, handler, request):
+        with self.pool.connection() as conn:
+            return handler(conn, request)
+
+    async def call(self, handler, request, write):
+        if write:
+            # Waits here rather than blocking the event loop when the writer's queue is full
+            async with self._write_slots:
+                return await asyncio.wrap_future(self.writer.submit(handler, request))
+        return await asyncio.get_running_loop().run_in_executor(self._readers, self._read, handler, request)
+
+    async def dispatch(self, method, target, body):
+        """
+        Runs one request and returns (status, JSON-serializable payload).
+        """
+        url = urlsplit(target)
+        if url.path == "/health":
+            return 200, {"ok": True, "requests": self.requests, "writer": self.writer.stats(),
+                         "cache": lookup_cache.stats()}
+        allowed = []
+        for route_method, pattern, handler, write in _ROUTES:
+            match = pattern.fullmatch(url.path)
+            if not match:
+                continue
+            if route_method != method:
+                allowed.append(route_method)
+                continue
+            try:
+                data = json.loads(body) if body else {}
+                if not isinstance(data, dict):
+                    raise HTTPError(400, "Request body must be a JSON object.")
+                request = Request([int(group) for group in match.groups()], dict(parse_qsl(url.query)), data)
+                result = await self.call(handler, request, write)
+            except HTTPError as e:
+                return e.status, {"error": str(e)}
+            except NotFoundError as e:
+                return 404, {"error": str(e)}
+            except (RepositoryError, ValueError) as e:
+                return 400, {"error": str(e)}
+            except sqlite3.IntegrityError as e:
+                return 409, {"error": str(e)}
+            except sqlite3.Error as e:
+                return 500, {"error": str(e)}
+            except Exception as e:
+                # A bug in a handler must not drop the client's connection
+                return 500, {"error": f"{type(e).__name__}: {e}"}
+            return (201 if method == "POST" else 200), result
+        if allowed:
+            return 405, {"error": f"Method {method} not allowed; use {', '.join(allowed)}."}
+        return 404, {"error": f"No endpoint at {url.path}."}
+
+    async def _client(self, reader, writer):
+        """
+        Serves one client connection, keeping it open between requests unless asked to close.
+        """
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 431, {"error": "Request headers too large."}, False)
+                    break
+                request_line, *header_lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+                try:
+                    method, target, version = request_line.split(" ")
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line."}, False)
+                    break
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    length = -1
+                if not 0 <= length <= MAX_BODY:
+                    await self._respond(writer, 413, {"error": "Invalid or too large Content-Length."}, False)
+                    break
+                try:
+                    body = await reader.readexactly(length) if length else b""
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+                self.requests += 1
+                status, payload = await self.dispatch(method.upper(), target, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload, default=str).encode()
+        writer.write(f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                     f"Content-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\n"
+                     f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(host, port, path=None, read_workers=READ_WORKERS):
+    api = APIServer(path, read_workers)
+    await api.start(host, port)
+    print(f"Serving {api.path} on http://{host}:{port} ({read_workers} reader threads, 1 writer)", flush=True)
+    # Stop on Ctrl-C or SIGTERM, committing queued writes before exiting
+    stop = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        asyncio.get_running_loop().add_signal_handler(signum, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        await api.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the school management system as a JSON API.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--read-workers", type=int, default=READ_WORKERS, help="threads serving reads")
+    args = parser.parse_args(argv)
+    asyncio.run(serve(args.host, args.port, args.db, args.read_workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import argparse
+from collections import namedtuple
+from datetime import date, timedelta
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for analytics
+    np = None
+
+from dates import day_number
+from db import DB_PATH, connect
+
+CHUNK_SIZE = 1 << 18  # Attendance ids covered by each chunk read into an array
+STREAK_WINDOW = 30  # Days covered by the rolling absence figures
+CHRONIC_THRESHOLD = 0.10  # Missing at least this share of school days counts as chronic absence
+
+EPOCH = date(1900, 1, 1)  # Day 0 of the day ordinals
+_EPOCH_DAY = day_number(EPOCH)  # EPOCH as a stored day number (days since 1970-01-01)
+# Each row is packed into one integer, student_id << 21 | day << 1 | present, with day counted
+# from EPOCH (fits 20 bits until the year 4770). SQLite joins a whole id range of them into one
+# string that numpy parses in C, so no Python object is created per row.
+_PACKED_CHUNK = f"""
+    SELECT group_concat((student_id << 21) | ((date - {_EPOCH_DAY}) << 1) | (present != 0))
+    FROM Attendance
+    WHERE id > ? AND id <= ? AND date >= {_EPOCH_DAY}
+"""
+
+AttendanceColumns = namedtuple("AttendanceColumns", "student_id day present")
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("Attendance analytics needs numpy: pip install numpy")
+
+
+def day_to_date(day):
+    return EPOCH + timedelta(days=int(day))
+
+
+def load_attendance(conn, chunk_size=CHUNK_SIZE):
+    """
+    Loads Attendance as columns: student_id (int64), day ordinal (int32) and present (bool) arrays.
+    """
+    _require_numpy()
+    low, high = conn.execute("SELECT min(id), max(id) FROM Attendance").fetchone()
+    chunks = []
+    if low is not None:
+        for start in range(low - 1, high, chunk_size):
+            packed = conn.execute(_PACKED_CHUNK, (start, start + chunk_size)).fetchone()[0]
+            if packed:
+                chunks.append(np.fromstring(packed, dtype=np.int64, sep=','))
+    packed = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+    return AttendanceColumns(packed >> 21, ((packed >> 1) & 0xFFFFF).astype(np.int32), (packed & 1).astype(bool))
+
+
+def student_rates(columns):
+    """
+    Per-student attendance: (student_ids, records, days present, attendance rate) arrays.
+    """
+    student_ids, index = np.unique(columns.student_id, return_inverse=True)
+    records = np.bincount(index, minlength=len(student_ids))
+    present = np.bincount(index, weights=columns.present, minlength=len(student_ids)).astype(np.int64)
+    return student_ids, records, present, present / np.maximum(records, 1)
+
+
+def daily_rates(columns):
+    """
+    Per-day attendance across the school: (day ordinals, records, attendance rate) arrays.
+    """
+    days, index = np.unique(columns.day, return_inverse=True)
+    records = np.bincount(index, minlength=len(days))
+    present = np.bincount(index, weights=columns.present, minlength=len(days))
+    return days, records, present / np.maximum(records, 1)
+
+
+def class_rates(conn, columns):
+    """
+    Per-class attendance from every enrolled student's records: (class_ids, records, attendance rate) arrays.
+    """
+    enrollment = np.array(conn.execute("SELECT student_id, class_id FROM Student_Class").fetchall(),
+                          dtype=np.int64).reshape(-1, 2)
+    student_ids, records, present, _ = student_rates(columns)
+    # Position of each enrolled student in student_ids; students with no records are dropped
+    if len(student_ids):
+        position = np.minimum(np.searchsorted(student_ids, enrollment[:, 0]), len(student_ids) - 1)
+        known = student_ids[position] == enrollment[:, 0]
+    else:
+        position = np.zeros(len(enrollment), dtype=np.int64)
+        known = np.zeros(len(enrollment), dtype=bool)
+    class_ids, class_index = np.unique(enrollment[known, 1], return_inverse=True)
+    class_records = np.bincount(class_index, weights=records[position[known]], minlength=len(class_ids))
+    class_present = np.bincount(class_index, weights=present[position[known]], minlength=len(class_ids))
+    return class_ids, class_records.astype(np.int64), class_present / np.maximum(class_records, 1)
+
+
+def absence_streaks(columns, window=STREAK_WINDOW):
+    """
+    Rolling absence figures over the last `window` days of data, per student:
+    (student_ids, absences in the window, longest run of consecutive absent records in the window).
+    """
+    if len(columns.day) == 0:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty
+    recent = columns.day > columns.day.max() - window
+    student = columns.student_id[recent]
+    day = columns.day[recent]
+    absent = ~columns.present[recent]
+
+    order = np.lexsort((day, student))
+    student, absent = student[order], absent[order]
+    student_ids, index = np.unique(student, return_inverse=True)
+    absences = np.bincount(index, weights=absent, minlength=len(student_ids)).astype(np.int64)
+
+    # An absence continues a run when the previous record is an absence of the same student
+    same_student = np.r_[False, student[1:] == student[:-1]]
+    continues = absent & np.r_[False, absent[:-1]] & same_student
+    starts = absent & ~continues
+    run_of = np.cumsum(starts)[absent]  # run number of every absent record, from 1
+    run_lengths = np.bincount(run_of)[1:]
+    longest = np.zeros(len(student_ids), dtype=np.int64)
+    np.maximum.at(longest, index[starts], run_lengths)
+    return student_ids, absences, longest
+
+
+def chronic_absentees(columns, threshold=CHRONIC_THRESHOLD):
+    """
+    Students who missed at least `threshold` of their recorded days: (student_ids, absence rate) arrays.
+    """
+    student_ids, _, _, rates = student_rates(columns)
+    chronic = (1 - rates) >= threshold
+    return student_ids[chronic], 1 - rates[chronic]
+
+
+def summarize(conn, window=STREAK_WINDOW, threshold=CHRONIC_THRESHOLD):
+    """
+    Runs every analysis over one load of Attendance and returns the headline numbers as a dict.
+    """
+    columns = load_attendance(conn)
+    student_ids, records, present, rates = student_rates(columns)
+    days, _, day_rate = daily_rates(columns)
+    class_ids, _, class_rate = class_rates(conn, columns)
+    streak_ids, absences, longest = absence_streaks(columns, window)
+    chronic_ids, chronic_rate = chronic_absentees(columns, threshold)
+    worst_day = int(np.argmin(day_rate)) if len(days) else None
+    return {
+        "records": int(len(columns.day)),
+        "students": int(len(student_ids)),
+        "overall_rate": float(present.sum() / max(records.sum(), 1)),
+        "days": int(len(days)),
+        "lowest_day": (day_to_date(days[worst_day]).isoformat(), float(day_rate[worst_day])) if worst_day is not None else None,
+        "class_rates": {int(class_id): float(rate) for class_id, rate in zip(class_ids, class_rate)},
+        "chronic_absentees": {int(student_id): float(rate) for student_id, rate in zip(chronic_ids, chronic_rate)},
+        "longest_recent_streaks": sorted(((int(s), int(n)) for s, n in zip(streak_ids, longest) if n > 1),
+                                         key=lambda item: -item[1])[:20],
+        "recent_absences": int(absences.sum()),
+    }
+
+
+def print_summary(summary, window=STREAK_WINDOW, threshold=CHRONIC_THRESHOLD):
+    print(f"\nAttendance records: {summary['records']} for {summary['students']} students over {summary['days']} days")
+    print(f"Overall attendance rate: {summary['overall_rate']:.1%}")
+    if summary["lowest_day"]:
+        print(f"Lowest attendance day: {summary['lowest_day'][0]} ({summary['lowest_day'][1]:.1%})")
+    if summary["class_rates"]:
+        print("Lowest attendance classes (class ID: rate):")
+        for class_id, rate in sorted(summary["class_rates"].items(), key=lambda item: item[1])[:10]:
+            print(f"  {class_id}: {rate:.1%}")
+    print(f"Absences in the last {window} days: {summary['recent_absences']}")
+    for student_id, streak in summary["longest_recent_streaks"][:10]:
+        print(f"  Student ID {student_id}: {streak} consecutive absences")
+    print(f"Chronically absent students (missing {threshold:.0%} or more): {len(summary['chronic_absentees'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Attendance rates, absence streaks and chronic absence.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--window", type=int, default=STREAK_WINDOW, help="days in the rolling absence window")
+    parser.add_argument("--threshold", type=float, default=CHRONIC_THRESHOLD, help="absence rate flagged as chronic")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    print_summary(summarize(conn, args.window, args.threshold), args.window, args.threshold)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
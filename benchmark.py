@@ -0,0 +1,175 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import date, timedelta
+
+import grade_stats
+from csv_export import export_query, table_query
+from dates import day_number, from_day_number
+from db import connect
+from migrations import migrate
+from repository import AttendanceRepo, ClassRepo, GradeRepo, StudentRepo
+
+REPEAT = 20  # Timed runs of each quick operation
+EXPORT_REPEAT = 3  # Timed runs of each export and report
+BENCHMARK_SUBJECT = "Benchmark"  # Subject of the grades the add_grade benchmark writes
+TABLES = ["Students", "Classes", "Student_Class", "Grades", "Attendance"]
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _summary(seconds):
+    seconds = sorted(seconds)
+    return {
+        "runs": len(seconds),
+        "min_ms": round(seconds[0] * 1000, 3),
+        "median_ms": round(statistics.median(seconds) * 1000, 3),
+        "mean_ms": round(statistics.fmean(seconds) * 1000, 3),
+        "p95_ms": round(seconds[min(int(len(seconds) * 0.95), len(seconds) - 1)] * 1000, 3),
+        "max_ms": round(seconds[-1] * 1000, 3),
+    }
+
+
+def _time(operation, arguments):
+    """
+    Runs operation(*args) once per entry of `arguments` and returns the wall time of each run.
+    """
+    seconds = []
+    for args in arguments:
+        start = time.perf_counter()
+        operation(*args)
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+def operations(conn, workdir, repeat=REPEAT, export_repeat=EXPORT_REPEAT, seed=0):
+    """
+    The operations behind the menu, each as (name, callable, list of argument tuples, cleanup or None).
+    """
+    rng = random.Random(seed)
+    student_ids = [row[0] for row in conn.execute("SELECT id FROM Students ORDER BY random() LIMIT ?", (repeat,))]
+    class_ids = [row[0] for row in conn.execute("SELECT id FROM Classes ORDER BY random() LIMIT ?", (repeat,))]
+    names = [row[0] for row in conn.execute("SELECT name FROM Students ORDER BY random() LIMIT ?", (repeat,))]
+    students, grades, attendance, classes = StudentRepo(conn), GradeRepo(conn), AttendanceRepo(conn), ClassRepo(conn)
+    # Writes go on dates far in the future (or a subject of their own) so they never collide
+    # with real data, and are removed afterwards
+    roll_dates = [(date(2999, 1, 1) + timedelta(days=n)).isoformat() for n in range(repeat)]
+    # Range queries cover the last week and the last term (90 days) of recorded attendance
+    last_day = conn.execute("SELECT max(date) FROM Attendance").fetchone()[0] or day_number(date.today())
+    week = (from_day_number(last_day - 6).isoformat(), from_day_number(last_day).isoformat())
+    term = (from_day_number(last_day - 89).isoformat(), week[1])
+
+    def remove_roll_calls():
+        with conn:
+            conn.execute("DELETE FROM Attendance WHERE date >= ?", (day_number(date(2999, 1, 1)),))
+
+    def remove_grades():
+        with conn:
+            conn.execute("DELETE FROM Grades WHERE subject_id IN (SELECT id FROM Subjects WHERE name = ?)",
+                         (BENCHMARK_SUBJECT,))
+
+    def export(table):
+        export_query(conn.cursor(), table_query(table), os.path.join(workdir, f"{table}.csv"), progress=None)
+
+    return [
+        ("search_prefix", students.search, [(name.split()[0][:4],) for name in names], None),
+        ("search_substring", students.search, [(name[2:7],) for name in names], None),
+        ("search_fuzzy", students.search, [(name[:4] + "x" + name[5:9],) for name in names], None),
+        ("student_page", students.page_with_classes, [(rng.choice(student_ids),) for _ in student_ids], None),
+        ("student_grades", grades.for_student, [(student_id,) for student_id in student_ids], None),
+        ("student_attendance", attendance.for_student, [(student_id,) for student_id in student_ids], None),
+        ("class_roster", classes.roster, [(class_id,) for class_id in class_ids], None),
+        ("class_attendance_week", attendance.between, [week + (class_id,) for class_id in class_ids], None),
+        ("attendance_week_totals", attendance.totals_between, [week] * export_repeat, None),
+        ("grades_term_averages", grades.averages_between, [term] * export_repeat, None),
+        ("roll_call", attendance.roll_call, [(class_id, [], day) for class_id, day in zip(class_ids, roll_dates)],
+         remove_roll_calls),
+        ("add_grade", grades.add, [(student_id, BENCHMARK_SUBJECT, 3) for student_id in student_ids],
+         remove_grades),
+        ("grade_averages", grade_stats.student_averages, [(conn,)] * export_repeat, None),
+        ("export_students_csv", export, [("Students",)] * export_repeat, None),
+        ("export_grades_csv", export, [("Grades",)] * export_repeat, None),
+    ]
+
+
+def run_benchmarks(conn, only=None, repeat=REPEAT, export_repeat=EXPORT_REPEAT):
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, operation, arguments, cleanup in operations(conn, workdir, repeat, export_repeat):
+            if only and name not in only or not arguments:
+                continue
+            try:
+                results[name] = _summary(_time(operation, arguments))
+            finally:
+                if cleanup:
+                    cleanup()
+            print(f"{name:22} median {results[name]['median_ms']:10.3f} ms  p95 {results[name]['p95_ms']:10.3f} ms",
+                  flush=True)
+    return results
+
+
+def compare(previous, current):
+    """
+    Prints each operation's median against a previous results file.
+    """
+    print(f"\nCompared with {previous.get('revision') or 'previous run'} ({previous.get('timestamp')}):")
+    for name, result in current["results"].items():
+        before = previous.get("results", {}).get(name)
+        if before:
+            ratio = result["median_ms"] / before["median_ms"] if before["median_ms"] else float("inf")
+            print(f"{name:22} {before['median_ms']:10.3f} -> {result['median_ms']:10.3f} ms  ({ratio:.2f}x)")
+
+
+def main(argv=None):
+    """
+    Times the menu's operations against a (generated) database and writes the results as JSON,
+    e.g. `python benchmark.py bench.db --output results.json --compare baseline.json`.
+    """
+    parser = argparse.ArgumentParser(description="Time the school database operations and save the results as JSON.")
+    parser.add_argument("db", help="database to benchmark; see generate_data.py")
+    parser.add_argument("--output", help="JSON file for the results (default: benchmark-<revision>.json)")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    parser.add_argument("--only", nargs="+", help="operations to run")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        parser.error(f"{args.db} does not exist; create one with generate_data.py")
+    conn = connect(args.db)
+    migrate(conn)
+    revision = _git_revision()
+    report = {
+        "revision": revision,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "db": os.path.abspath(args.db),
+        "rows": {table: conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0] for table in TABLES},
+    }
+    report["results"] = run_benchmarks(conn, args.only, args.repeat)
+    conn.close()
+
+    output = args.output or f"benchmark-{revision or 'local'}.json"
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+import sys
+
+from dates import ISO_DATE
+from db import DB_PATH, connect
+from migrations import CHANGE_TABLES, migrate
+
+CHUNK_SIZE = 500  # Changed rows fetched per query (kept under SQLite's bound-parameter limit)
+
+_TABLE_NAMES = {code: table for table, code in CHANGE_TABLES.items()}
+
+# Columns sent for a changed row where not all as stored: day numbers go out as YYYY-MM-DD
+_COLUMNS = {
+    "Grades": f"id, student_id, subject_id, grade, {ISO_DATE.format('date')} AS date",
+    "Attendance": f"id, student_id, {ISO_DATE.format('date')} AS date, present",
+}
+
+
+def cursor_position(conn, consumer):
+    """
+    The last change seq exported for `consumer`, or 0 for a consumer that has never exported.
+    """
+    row = conn.execute("SELECT seq FROM Sync_Cursors WHERE consumer = ?", (consumer,)).fetchone()
+    return row[0] if row else 0
+
+
+def _rows(conn, table, ids):
+    cursor = conn.execute(f"SELECT {_COLUMNS.get(table, '*')} FROM {table} WHERE id IN ({','.join('?' * len(ids))})", ids)
+    columns = [column[0] for column in cursor.description]
+    return {row[0]: dict(zip(columns, row)) for row in cursor}
+
+
+def changes(conn, after, until, chunk_size=CHUNK_SIZE):
+    """
+    Yields the changes with after < seq <= until as dicts {seq, table, op, id, row}, oldest first.
+
+    Each changed row appears once, at its latest seq, however often it changed: op is "upsert"
+    with the row's current values, or "delete" (row None) if it no longer exists.
+    """
+    log = conn.execute("""
+        SELECT table_code, row_id, max(seq) AS last_seq FROM Change_Log
+        WHERE seq > ? AND seq <= ?
+        GROUP BY table_code, row_id
+        ORDER BY last_seq
+    """, (after, until))
+    while True:
+        chunk = log.fetchmany(chunk_size)
+        if not chunk:
+            break
+        by_table = {}
+        for code, row_id, _ in chunk:
+            by_table.setdefault(code, []).append(row_id)
+        current = {code: _rows(conn, _TABLE_NAMES[code], ids) for code, ids in by_table.items()}
+        for code, row_id, seq in chunk:
+            row = current[code].get(row_id)
+            yield {"seq": seq, "table": _TABLE_NAMES[code], "op": "upsert" if row else "delete", "id": row_id,
+                   "row": row}
+
+
+def _write(records, output):
+    count = 0
+    for record in records:
+        output.write(json.dumps(record, default=str) + "\n")
+        count += 1
+    return count
+
+
+def export_changes(conn, consumer, output):
+    """
+    Writes every change since `consumer`'s cursor to `output` (a file name, or '-' for stdout) as
+    JSON Lines, then advances the cursor. Returns (changes written, new cursor).
+
+    The changes are read in one transaction up to the newest seq at its start, so writes made
+    meanwhile are left for the next export. A file is written under a temporary name and renamed,
+    and the cursor only moves once it is complete, so a failed export is simply repeated.
+    """
+    after = cursor_position(conn, consumer)
+    conn.execute("BEGIN")
+    try:
+        until = conn.execute("SELECT coalesce(max(seq), 0) FROM Change_Log").fetchone()[0]
+        if output == '-':
+            count = _write(changes(conn, after, until), sys.stdout)
+            sys.stdout.flush()
+        else:
+            with open(f"{output}.tmp", "w") as f:
+                count = _write(changes(conn, after, until), f)
+            os.replace(f"{output}.tmp", output)
+    finally:
+        conn.rollback()
+    if until > after:
+        with conn:
+            conn.execute("""
+                INSERT INTO Sync_Cursors (consumer, seq) VALUES (?, ?)
+                ON CONFLICT (consumer) DO UPDATE SET seq = excluded.seq, updated_at = CURRENT_TIMESTAMP
+            """, (consumer, until))
+    return count, max(until, after)
+
+
+def status(conn):
+    """
+    The log's extent and each consumer's cursor with the number of log entries still ahead of it.
+    """
+    first, last, entries = conn.execute("SELECT min(seq), max(seq), count(*) FROM Change_Log").fetchone()
+    consumers = [{"consumer": consumer, "seq": seq, "pending": pending, "updated_at": updated_at}
+                 for consumer, seq, updated_at, pending in conn.execute("""
+                     SELECT consumer, seq, updated_at,
+                            (SELECT count(*) FROM Change_Log l WHERE l.seq > c.seq)
+                     FROM Sync_Cursors c ORDER BY consumer
+                 """)]
+    return {"first_seq": first, "last_seq": last, "entries": entries, "consumers": consumers}
+
+
+def register(conn, consumer):
+    """
+    Starts `consumer`'s cursor at the newest change, before it takes its full export, so prune()
+    keeps every change made from then on for its first export. Returns the cursor.
+    """
+    with conn:
+        conn.execute("""
+            INSERT INTO Sync_Cursors (consumer, seq) SELECT ?, coalesce(max(seq), 0) FROM Change_Log WHERE true
+            ON CONFLICT (consumer) DO UPDATE SET seq = excluded.seq, updated_at = CURRENT_TIMESTAMP
+        """, (consumer,))
+    return cursor_position(conn, consumer)
+
+
+def prune(conn, everything=False):
+    """
+    Deletes the log entries every consumer has already exported. Returns the number deleted.
+    With no consumer registered nobody has read the log, so it is only emptied if `everything` is set.
+    """
+    with conn:
+        if not everything and not conn.execute("SELECT 1 FROM Sync_Cursors LIMIT 1").fetchone():
+            raise ValueError("No consumer is registered; register one before its full export, or prune --all.")
+        return conn.execute("""
+            DELETE FROM Change_Log
+            WHERE seq <= coalesce((SELECT min(seq) FROM Sync_Cursors), (SELECT max(seq) FROM Change_Log))
+        """).rowcount
+
+
+def forget(conn, consumer):
+    """
+    Removes a consumer's cursor, so it no longer holds back prune().
+    """
+    with conn:
+        return conn.execute("DELETE FROM Sync_Cursors WHERE consumer = ?", (consumer,)).rowcount
+
+
+def main(argv=None):
+    """
+    Exports what changed since a consumer's last sync, e.g. `python change_log.py export warehouse changes.jsonl`.
+    """
+    parser = argparse.ArgumentParser(description="Export row changes since a consumer's last sync as JSON Lines.")
+    parser.add_argument("--db", default=DB_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    cmd = commands.add_parser("register", help="start a new consumer's cursor now, before its full export")
+    cmd.add_argument("consumer")
+    cmd = commands.add_parser("export")
+    cmd.add_argument("consumer", help="name of the downstream system; each keeps its own cursor")
+    cmd.add_argument("output", nargs="?", default="-", help="JSON Lines file ('-' for stdout)")
+    commands.add_parser("status")
+    cmd = commands.add_parser("prune", help="delete log entries every consumer has exported")
+    cmd.add_argument("--all", action="store_true", help="empty the whole log when no consumer is registered")
+    cmd = commands.add_parser("forget", help="remove a consumer's cursor")
+    cmd.add_argument("consumer")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    migrate(conn)
+    if args.command == "register":
+        print(f"{args.consumer}: cursor at {register(conn, args.consumer)}", file=sys.stderr)
+    elif args.command == "export":
+        count, seq = export_changes(conn, args.consumer, args.output)
+        print(f"{args.consumer}: {count} changes, cursor at {seq}", file=sys.stderr)
+    elif args.command == "status":
+        print(json.dumps(status(conn), indent=2))
+    elif args.command == "prune":
+        try:
+            print(f"Deleted {prune(conn, args.all)} log entries")
+        except ValueError as e:
+            sys.exit(f"Error: {e}")
+    else:
+        print(f"Removed {forget(conn, args.consumer)} cursor(s)")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import csv
+import gzip
+import time
+
+from dates import ISO_DATE
+
+CHUNK_SIZE = 5000  # Rows pulled from the cursor per fetchmany() call
+
+# Tables whose CSV shape differs from their columns: grades show the subject name, not its id,
+# and dates stored as day numbers are written as YYYY-MM-DD
+TABLE_SELECTS = {
+    "grades": (f"SELECT g.id, g.student_id, sub.name AS subject, g.grade, {ISO_DATE.format('g.date')} AS date "
+               "FROM Grades g JOIN Subjects sub ON sub.id = g.subject_id", "g.id"),
+    "attendance": (f"SELECT id, student_id, {ISO_DATE.format('date')} AS date, present FROM Attendance", "id"),
+}
+
+
+def table_select(table):
+    """
+    (select without WHERE/ORDER BY, key column) giving `table`'s rows in their CSV shape.
+    """
+    return TABLE_SELECTS.get(table.lower(), (f"SELECT * FROM {table}", "id"))
+
+
+def table_query(table):
+    select, key = table_select(table)
+    return f"{select} ORDER BY {key}"
+
+
+def print_progress(rows, elapsed):
+    """
+    Default progress reporter: rewrites one status line with rows and rows/second.
+    """
+    rate = rows / elapsed if elapsed > 0 else 0
+    print(f"\r  {rows} rows exported ({rate:,.0f} rows/s)", end='', flush=True)
+
+
+def export_query(cursor, query, filename, params=(), header=None, chunk_size=CHUNK_SIZE,
+                 compress=False, write_empty=True, progress=print_progress):
+    """
+    Streams the result of `query` into a CSV file without loading it into memory.
+
+    Rows are read with fetchmany(chunk_size) and each chunk is handed straight to the
+    csv writer. The header defaults to the cursor's column names. With compress=True
+    the file is gzip-compressed and '.gz' is appended to the filename if missing.
+    Returns (filename, rows_written); filename is None when the result was empty and
+    write_empty is False.
+    """
+    cursor.execute(query, params)
+    if header is None:
+        header = [col[0] for col in cursor.description]
+
+    chunk = cursor.fetchmany(chunk_size)
+    if not chunk and not write_empty:
+        return None, 0
+
+    if compress:
+        if not filename.endswith('.gz'):
+            filename += '.gz'
+        csvfile = gzip.open(filename, 'wt', newline='')
+    else:
+        csvfile = open(filename, 'w', newline='')
+
+    rows = 0
+    start = time.perf_counter()
+    with csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(header)
+        while chunk:
+            writer.writerows(chunk)
+            rows += len(chunk)
+            if progress:
+                progress(rows, time.perf_counter() - start)
+            chunk = cursor.fetchmany(chunk_size)
+    if progress and rows:
+        print()
+    return filename, rows
@@ -0,0 +1,205 @@
+import csv
+import gzip
+import time
+from datetime import date
+
+from dates import day_number
+
+BATCH_SIZE = 50000  # Rows written per executemany() / transaction
+
+TRUE_VALUES = {'1', 'true', 'yes', 'present', 'y', 't'}
+FALSE_VALUES = {'0', 'false', 'no', 'absent', 'n', 'f', ''}
+
+
+def _open_csv(filename):
+    if filename.endswith('.gz'):
+        return gzip.open(filename, 'rt', newline='')
+    return open(filename, newline='')
+
+
+def _date_checker(convert=date.isoformat):
+    # Dates repeat heavily in bulk files, so validate and convert each distinct value only once
+    seen = {}
+
+    def check(value):
+        checked = seen.get(value)
+        if checked is None:
+            checked = convert(date.fromisoformat(value) if value else date.today())
+            seen[value] = checked
+        return checked
+    return check
+
+
+def _check_present(value):
+    value = value.strip().lower()
+    if value in TRUE_VALUES:
+        return 1
+    if value in FALSE_VALUES:
+        return 0
+    raise ValueError(f"invalid attendance value '{value}'")
+
+
+def _table_columns(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [row[1] for row in cursor.fetchall()]
+
+
+def _student_ids(cursor):
+    cursor.execute("SELECT id FROM Students")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def _subject_ids(cursor):
+    cursor.execute("SELECT name, id FROM Subjects")
+    return dict(cursor.fetchall())
+
+
+def _column(index, column, required=True):
+    """
+    Returns a getter for `column` in a CSV row; optional columns missing from the header read as ''.
+    """
+    position = index.get(column)
+    if position is None:
+        if required:
+            raise ValueError(f"missing column '{column}'")
+        return lambda row: ''
+    return lambda row: row[position]
+
+
+def _student_parser(index, student_ids, cursor):
+    get_id, get_name = _column(index, 'id', False), _column(index, 'name')
+    get_date, check_date = _column(index, 'registration_date', False), _date_checker()
+
+    def parse(row):
+        name = get_name(row).strip()
+        if not name:
+            raise ValueError("missing name")
+        student_id = get_id(row)
+        if student_id:
+            student_id = int(student_id)
+            if student_id in student_ids:
+                raise ValueError(f"student id {student_id} already exists")
+            student_ids.add(student_id)
+        else:
+            student_id = None
+        return student_id, name, check_date(get_date(row))
+    return ('id', 'name', 'registration_date'), parse
+
+
+def _grade_parser(index, student_ids, cursor):
+    get_student, get_subject = _column(index, 'student_id'), _column(index, 'subject')
+    get_grade, get_date = _column(index, 'grade'), _column(index, 'date', False)
+    check_date = _date_checker(day_number)
+    subject_ids = _subject_ids(cursor)
+
+    def subject_id(name):
+        # Subjects not seen before are added; the insert is committed with the next batch
+        found = subject_ids.get(name)
+        if found is None:
+            cursor.execute("INSERT INTO Subjects (name) VALUES (?)", (name,))
+            found = subject_ids[name] = cursor.lastrowid
+        return found
+
+    def parse(row):
+        student_id = int(get_student(row))
+        if student_id not in student_ids:
+            raise ValueError(f"student {student_id} not found")
+        subject = get_subject(row).strip()
+        if not subject:
+            raise ValueError("missing subject")
+        grade, grade_date = int(get_grade(row)), check_date(get_date(row))
+        return student_id, subject_id(subject), grade, grade_date
+    return ('student_id', 'subject_id', 'grade', 'date'), parse
+
+
+def _attendance_parser(index, student_ids, cursor):
+    get_student, get_present = _column(index, 'student_id'), _column(index, 'present')
+    get_date, check_date = _column(index, 'date', False), _date_checker(day_number)
+
+    def parse(row):
+        student_id = int(get_student(row))
+        if student_id not in student_ids:
+            raise ValueError(f"student {student_id} not found")
+        return student_id, check_date(get_date(row)), _check_present(get_present(row))
+    return ('student_id', 'date', 'present'), parse
+
+
+PARSERS = {
+    'students': ('Students', _student_parser),
+    'grades': ('Grades', _grade_parser),
+    'attendance': ('Attendance', _attendance_parser),
+}
+
+# Tables with a natural key: re-importing a row updates it instead of failing the batch
+ON_CONFLICT = {
+    'Attendance': " ON CONFLICT (student_id, date) DO UPDATE SET present = excluded.present",
+}
+
+
+def import_csv(conn, table_name, filename, batch_size=BATCH_SIZE, rejects_file=None):
+    """
+    Bulk loads a CSV file shaped like our export output into Students, Grades or Attendance.
+
+    Student ids are validated against one in-memory snapshot of Students (grade subjects are
+    mapped to ids the same way, adding new subjects), valid rows are
+    written with executemany() and committed every `batch_size` rows, and rows that fail
+    validation are skipped. Returns (imported, rejected, seconds) where rejected is a list
+    of (line_number, reason) tuples; rejected rows are also written to `rejects_file` if given.
+    """
+    table, make_parser = PARSERS[table_name.lower()]
+    c = conn.cursor()
+    table_columns = _table_columns(c, table)
+    student_ids = _student_ids(c)
+
+    start = time.perf_counter()
+    imported = 0
+    rejected = []
+    reject_writer = None
+    reject_out = open(rejects_file, 'w', newline='') if rejects_file else None
+
+    try:
+        with _open_csv(filename) as csvfile:
+            reader = csv.reader(csvfile)
+            header = next(reader, [])
+            index = {column.strip().lower(): i for i, column in enumerate(header)}
+            columns, parse = make_parser(index, student_ids, c)
+            # Only write the columns this database's version of the table has
+            keep = [i for i, col in enumerate(columns) if col in table_columns]
+            if len(keep) < len(columns):
+                columns = [columns[i] for i in keep]
+                parse_all = parse
+
+                def parse(row):
+                    values = parse_all(row)
+                    return [values[i] for i in keep]
+            query = (f"INSERT INTO {table} ({', '.join(columns)}) "
+                     f"VALUES ({', '.join('?' * len(columns))})" + ON_CONFLICT.get(table, ''))
+            if reject_out:
+                reject_writer = csv.writer(reject_out)
+                reject_writer.writerow(['line', 'reason'] + header)
+
+            batch = []
+            for row in reader:
+                try:
+                    batch.append(parse(row))
+                except (IndexError, ValueError) as e:
+                    rejected.append((reader.line_num, str(e)))
+                    if reject_writer:
+                        reject_writer.writerow([reader.line_num, str(e)] + row)
+                    continue
+
+                if len(batch) >= batch_size:
+                    with conn:
+                        c.executemany(query, batch)
+                    imported += len(batch)
+                    batch = []
+
+            if batch:
+                with conn:
+                    c.executemany(query, batch)
+                imported += len(batch)
+    finally:
+        if reject_out:
+            reject_out.close()
+
+    return imported, rejected, time.perf_counter() - start
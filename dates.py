@@ -0,0 +1,22 @@
+from datetime import date, timedelta
+
+EPOCH = date(1970, 1, 1)  # Day 0: Grades.date and Attendance.date hold whole days counted from it
+
+# SQL expressions (fill in a column or parameter) converting between day numbers and YYYY-MM-DD text
+ISO_DATE = "date({} * 86400, 'unixepoch')"
+DAY_NUMBER = "CAST(julianday(date({})) - 2440587.5 AS INTEGER)"
+TODAY = DAY_NUMBER.format("'now'")
+
+
+def day_number(value):
+    """
+    The day number of a date or YYYY-MM-DD string, raising ValueError if the string is malformed.
+    """
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    return (value - EPOCH).days
+
+
+def from_day_number(day):
+    return EPOCH + timedelta(days=day)
+
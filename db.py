@@ -0,0 +1,59 @@
+import os
+import sqlite3
+import threading
+
+from instrument import connection_factory
+
+DB_PATH = os.environ.get('SMS_DB', 'schooldb.db')
+
+BUSY_TIMEOUT_MS = 5000  # Wait this long for another writer instead of failing with "database is locked"
+CACHE_SIZE_KB = 64 * 1024  # Page cache per connection
+MMAP_SIZE = 256 * 1024 * 1024  # Bytes of the database file read through mmap
+
+_local = threading.local()
+
+
+def configure(conn):
+    """
+    Applies the per-connection PRAGMAs every connection to the school database should use.
+    """
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+def connect(path=None):
+    """
+    Opens a new, configured connection. The caller owns it and must close it.
+    """
+    conn = sqlite3.connect(path or DB_PATH, timeout=BUSY_TIMEOUT_MS / 1000, factory=connection_factory())
+    return configure(conn)
+
+
+def get_connection(path=None):
+    """
+    Returns this thread's connection to `path`, opening it on first use.
+    """
+    path = path or DB_PATH
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(path)
+    if conn is None:
+        conn = connections[path] = connect(path)
+    return conn
+
+
+def close_connection(path=None):
+    """
+    Closes this thread's connection to `path`, if it has one.
+    """
+    connections = getattr(_local, 'connections', {})
+    conn = connections.pop(path or DB_PATH, None)
+    if conn is not None:
+        conn.close()
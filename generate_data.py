@@ -0,0 +1,126 @@
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from dates import day_number
+from db import connect
+from migrations import migrate
+
+STUDENTS = 1000  # Default scale
+CLASS_SIZE = 25  # Students per class
+SCHOOL_DAYS = 180  # Days of attendance generated (weekdays, ending today)
+GRADES_PER_STUDENT = 10
+SUBJECTS = ["Math", "English", "Science", "History", "Geography", "Art", "Music", "Physical Education"]
+BATCH_SIZE = 50000  # Rows per executemany
+
+FIRST_NAMES = ["Ada", "Alan", "Amir", "Ana", "Chen", "Chloe", "Daniel", "Eva", "Fatima", "Grace", "Hana", "Ivan",
+               "James", "Joao", "Kofi", "Lena", "Liam", "Maria", "Mohammed", "Nora", "Olivia", "Omar", "Priya",
+               "Rosa", "Sofia", "Tariq", "Uma", "Victor", "Wei", "Yusuf", "Zara", "Noah", "Mia", "Lucas", "Aisha"]
+LAST_NAMES = ["Smith", "Johnson", "Garcia", "Martinez", "Lee", "Kim", "Nguyen", "Chen", "Khan", "Ali", "Silva",
+              "Santos", "Brown", "Jones", "Miller", "Davis", "Wilson", "Anderson", "Taylor", "Thomas", "Moore",
+              "Jackson", "Martin", "Thompson", "White", "Lopez", "Gonzalez", "Harris", "Clark", "Lewis", "Walker",
+              "Hall", "Young", "Allen", "Wright", "Scott", "Green", "Baker", "Adams", "Nelson", "Hill", "Campbell"]
+
+
+def school_days(count, end=None):
+    """
+    The last `count` weekdays up to `end` (default today), oldest first, as YYYY-MM-DD strings.
+    """
+    day = end or date.today()
+    days = []
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day.isoformat())
+        day -= timedelta(days=1)
+    return days[::-1]
+
+
+def _batches(rows, batch_size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert(conn, sql, rows, label):
+    start = time.perf_counter()
+    count = 0
+    for batch in _batches(rows):
+        with conn:
+            conn.executemany(sql, batch)
+        count += len(batch)
+    print(f"{label}: {count} rows in {time.perf_counter() - start:.1f}s", flush=True)
+    return count
+
+
+def generate(conn, students=STUDENTS, class_size=CLASS_SIZE, days=SCHOOL_DAYS, grades_per_student=GRADES_PER_STUDENT,
+             seed=0):
+    """
+    Appends a synthetic school to a migrated database: classes of `class_size`, `students` students
+    enrolled one class each, `grades_per_student` grades each and `days` school days of attendance.
+    The same seed always produces the same data.
+    """
+    rng = random.Random(seed)
+    start_id = conn.execute("SELECT coalesce(max(id), 0) FROM Students").fetchone()[0]
+    first_class = conn.execute("SELECT coalesce(max(id), 0) FROM Classes").fetchone()[0]
+    class_count = max(1, -(-students // class_size))
+    dates = school_days(days)
+    first_day = date.fromisoformat(dates[0]) if dates else date.today()
+    day_numbers = [day_number(day) for day in dates]
+
+    _insert(conn, "INSERT INTO Classes (id, class_name, grade_level) VALUES (?, ?, ?)",
+            ((first_class + n + 1, f"{n % 6 + 1}-{first_class + n + 1:05d}", n % 6 + 1) for n in range(class_count)),
+            "Classes")
+    _insert(conn, "INSERT INTO Students (id, name, registration_date) VALUES (?, ?, ?)",
+            ((start_id + n + 1, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+              (first_day - timedelta(days=rng.randrange(365 * 5))).isoformat()) for n in range(students)),
+            "Students")
+    _insert(conn, "INSERT INTO Student_Class (student_id, class_id) VALUES (?, ?)",
+            ((start_id + n + 1, first_class + n // class_size + 1) for n in range(students)), "Student_Class")
+    with conn:
+        conn.executemany("INSERT OR IGNORE INTO Subjects (name) VALUES (?)", [(subject,) for subject in SUBJECTS])
+    subject_ids = [conn.execute("SELECT id FROM Subjects WHERE name = ?", (subject,)).fetchone()[0]
+                   for subject in SUBJECTS]
+    _insert(conn, "INSERT INTO Grades (student_id, subject_id, grade, date) VALUES (?, ?, ?, ?)",
+            ((start_id + n + 1, rng.choice(subject_ids), rng.randint(1, 6), rng.choice(day_numbers) if dates else day_number(first_day))
+             for n in range(students) for _ in range(grades_per_student)), "Grades")
+
+    # Most students are rarely absent; about one in ten misses school often. Rows go in
+    # (student, day) order, matching the unique index, so index pages are appended to, not split
+    absence = [rng.choice((0.02, 0.04, 0.06)) if rng.random() > 0.1 else rng.uniform(0.12, 0.3)
+               for _ in range(students)]
+    _insert(conn, "INSERT INTO Attendance (student_id, date, present) VALUES (?, ?, ?)",
+            ((start_id + n + 1, day, rng.random() >= absence[n]) for n in range(students) for day in day_numbers),
+            "Attendance")
+    conn.execute("ANALYZE")
+
+
+def main(argv=None):
+    """
+    Fills a database with synthetic data, e.g. `python generate_data.py bench.db --students 100000 --days 360`.
+    """
+    parser = argparse.ArgumentParser(description="Fill a school database with synthetic data at a chosen scale.")
+    parser.add_argument("db", help="database file to create or extend")
+    parser.add_argument("--students", type=int, default=STUDENTS)
+    parser.add_argument("--class-size", type=int, default=CLASS_SIZE)
+    parser.add_argument("--days", type=int, default=SCHOOL_DAYS, help="school days of attendance (180 is about a year)")
+    parser.add_argument("--grades", type=int, default=GRADES_PER_STUDENT, help="grades per student")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    migrate(conn)
+    conn.execute("PRAGMA synchronous = OFF")  # generated data can always be generated again
+    start = time.perf_counter()
+    generate(conn, args.students, args.class_size, args.days, args.grades, args.seed)
+    print(f"Generated {args.db} in {time.perf_counter() - start:.1f}s")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
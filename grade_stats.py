@@ -0,0 +1,88 @@
+import argparse
+import csv
+import sys
+
+from db import DB_PATH, connect
+
+_RECOMPUTE = """
+    SELECT student_id, subject_id, count(*), sum(grade), min(grade), max(grade)
+    FROM Grades
+    GROUP BY student_id, subject_id
+"""
+
+
+def student_averages(conn):
+    """
+    Overall grade summary per student from Student_Grade_Stats, without reading Grades:
+    (student id, name, grade count, mean, min, max) rows ordered by student id.
+    """
+    return conn.execute("""
+        SELECT st.student_id, s.name, sum(st.grade_count),
+               round(1.0 * sum(st.grade_sum) / sum(st.grade_count), 2),
+               min(st.min_grade), max(st.max_grade)
+        FROM Student_Grade_Stats st
+        JOIN Students s ON s.id = st.student_id
+        GROUP BY st.student_id
+        ORDER BY st.student_id
+    """).fetchall()
+
+
+def subject_stats(conn, student_id=None):
+    """
+    Per-subject summary, for one student or for every student:
+    (student id, subject, grade count, mean, min, max) rows.
+    """
+    query = """
+        SELECT st.student_id, sub.name, st.grade_count, round(1.0 * st.grade_sum / st.grade_count, 2),
+               st.min_grade, st.max_grade
+        FROM Student_Grade_Stats st
+        JOIN Subjects sub ON sub.id = st.subject_id
+    """
+    if student_id is None:
+        return conn.execute(query + " ORDER BY st.student_id, sub.name").fetchall()
+    return conn.execute(query + " WHERE st.student_id = ? ORDER BY sub.name", (student_id,)).fetchall()
+
+
+def check_drift(conn):
+    """
+    Compares Student_Grade_Stats against a fresh aggregation of Grades.
+    Returns the (student_id, subject_id) keys that are missing, stale or extra.
+    """
+    stored = {(row[0], row[1]): row[2:] for row in conn.execute(
+        "SELECT student_id, subject_id, grade_count, grade_sum, min_grade, max_grade FROM Student_Grade_Stats")}
+    actual = {(row[0], row[1]): row[2:] for row in conn.execute(_RECOMPUTE)}
+    return sorted(key for key in stored.keys() | actual.keys() if stored.get(key) != actual.get(key))
+
+
+def rebuild(conn):
+    """
+    Recomputes Student_Grade_Stats from scratch in one transaction. Returns the drifted keys found beforehand.
+    """
+    drift = check_drift(conn)
+    with conn:
+        conn.execute("DELETE FROM Student_Grade_Stats")
+        conn.execute(f"INSERT INTO Student_Grade_Stats (student_id, subject_id, grade_count, grade_sum, min_grade, max_grade) {_RECOMPUTE}")
+    return drift
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grade aggregate report and maintenance.")
+    parser.add_argument("command", choices=["report", "rebuild"])
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    if args.command == "report":
+        writer = csv.writer(sys.stdout)
+        writer.writerow(["student_id", "name", "grades", "mean", "min", "max"])
+        writer.writerows(student_averages(conn))
+    else:
+        drift = rebuild(conn)
+        print(f"Rebuilt Student_Grade_Stats; {len(drift)} drifted (student, subject) groups corrected.")
+        for student_id, subject_id in drift[:20]:
+            print(f"  student {student_id}, subject {subject_id}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
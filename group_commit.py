@@ -0,0 +1,235 @@
+import argparse
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+
+import lookup_cache
+from db import DB_PATH, connect
+from migrations import migrate
+from repository import AttendanceRepo, StudentRepo
+
+MAX_BATCH = 256  # Writes grouped into one transaction at most
+MAX_DELAY_MS = 1  # How long the first write of a batch waits for company
+QUEUE_SIZE = 10000  # Writes waiting for the writer before producers block
+LATENCY_SAMPLES = 10000  # Recent submit-to-acknowledge latencies kept for percentiles
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    """
+    A single writer thread that owns the read-write connection and commits queued writes in groups.
+
+    Producers call submit(fn, *args) from any thread and get a Future. The writer collects up to
+    max_batch writes, or whatever arrives within max_delay_ms of the first one, runs each as
+    fn(conn, *args) in its own savepoint inside one transaction, and commits once. The connection
+    runs with synchronous=FULL, so a Future resolves only when its batch is on disk, and one fsync
+    is shared by the whole batch instead of being paid per row. A write that raises is rolled back
+    to its savepoint and fails only its own Future. A write whose Future is cancelled before its
+    batch starts is skipped; once the batch starts, cancel() returns False.
+
+    Writes must not commit themselves; repository methods nest in the batch automatically.
+    """
+
+    def __init__(self, path=None, max_batch=MAX_BATCH, max_delay_ms=MAX_DELAY_MS, queue_size=QUEUE_SIZE):
+        self.path = path or DB_PATH
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self._queue = queue.Queue(queue_size)
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.submitted = 0
+        self.committed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.batches = 0
+        self.commit_seconds = 0.0
+        self.started_at = None
+
+    def start(self):
+        ready = Future()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name="sms-group-commit", daemon=True)
+        self._thread.start()
+        ready.result()  # re-raises if the connection could not be opened
+        self.started_at = time.monotonic()
+        return self
+
+    def submit(self, fn, *args):
+        """
+        Queues fn(conn, *args) and returns a Future with its result, set once its batch has committed.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            raise RuntimeError("Group commit writer is not running.")
+        future = Future()
+        with self._lock:
+            self.submitted += 1
+        self._queue.put((fn, args, future, time.perf_counter()))
+        return future
+
+    def write(self, fn, *args):
+        """
+        Submits a write and waits until it is durable; returns its result or raises its error.
+        """
+        return self.submit(fn, *args).result()
+
+    def close(self):
+        """
+        Commits everything already queued, then stops the writer and closes its connection.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _run(self, ready):
+        try:
+            conn = connect(self.path)
+            conn.execute("PRAGMA synchronous = FULL")
+        except Exception as e:
+            ready.set_exception(e)
+            return
+        ready.set_result(None)
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    # Take whatever is already queued, then wait out the rest of the delay
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0)) \
+                        if self.max_delay else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            # Claims each Future so it can no longer be cancelled, and drops those already cancelled
+            running = [item for item in batch if item[2].set_running_or_notify_cancel()]
+            with self._lock:
+                self.cancelled += len(batch) - len(running)
+            if running:
+                self._commit(conn, running)
+        conn.close()
+
+    def _commit(self, conn, batch):
+        outcomes = []
+        start = time.perf_counter()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for fn, args, future, _ in batch:
+                conn.execute("SAVEPOINT group_write")
+                try:
+                    outcomes.append((True, fn(conn, *args)))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO group_write")
+                    outcomes.append((False, e))
+                finally:
+                    conn.execute("RELEASE group_write")
+            conn.commit()
+        except Exception as e:
+            # The batch as a whole did not commit: nothing in it is durable
+            if conn.in_transaction:
+                conn.rollback()
+            outcomes = [(False, e)] * len(batch)
+        # Cache entries dropped by the writes are dropped again now that readers see the new rows
+        lookup_cache.committed(conn)
+        finished = time.perf_counter()
+
+        with self._lock:
+            self.batches += 1
+            self.commit_seconds += finished - start
+            for (_, _, _, submitted_at), (ok, _) in zip(batch, outcomes):
+                self._latencies.append(finished - submitted_at)
+                if ok:
+                    self.committed += 1
+                else:
+                    self.failed += 1
+        for (_, _, future, _), (ok, value) in zip(batch, outcomes):
+            try:
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+            except InvalidStateError:
+                pass  # already resolved; the writer must keep serving the rest of the queue
+
+    def stats(self):
+        """
+        Counters since start: writes, batches, throughput and submit-to-durable latency percentiles (ms).
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                "submitted": self.submitted,
+                "committed": self.committed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "queued": self._queue.qsize(),
+                "batches": self.batches,
+                "mean_batch_size": round((self.committed + self.failed) / self.batches, 2) if self.batches else 0,
+                "commit_seconds": round(self.commit_seconds, 3),
+            }
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0
+        stats["writes_per_second"] = round(stats["committed"] / elapsed, 1) if elapsed else 0
+        for name, share in (("p50_ms", 0.50), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+            stats[name] = round(latencies[min(int(len(latencies) * share), len(latencies) - 1)] * 1000, 2) \
+                if latencies else 0
+        stats["max_ms"] = round(latencies[-1] * 1000, 2) if latencies else 0
+        return stats
+
+
+def _benchmark(path, producers, writes, max_batch, max_delay_ms):
+    conn = connect(path)
+    migrate(conn)
+    student_ids = [row[0] for row in conn.execute("SELECT id FROM Students LIMIT 1000")]
+    conn.close()
+    if not student_ids:
+        with GroupCommitWriter(path) as writer:
+            futures = [writer.submit(lambda conn, n: StudentRepo(conn).add(f"Benchmark student {n}"), n)
+                       for n in range(100)]
+            student_ids = [future.result() for future in futures]
+
+    def produce(producer):
+        for n in range(writes):
+            student_id = student_ids[(producer * writes + n) % len(student_ids)]
+            day = f"2024-{n % 12 + 1:02d}-{n % 28 + 1:02d}"
+            writer.write(lambda conn: AttendanceRepo(conn).record(student_id, n % 10 != 0, day))
+
+    with GroupCommitWriter(path, max_batch=max_batch, max_delay_ms=max_delay_ms) as writer:
+        with ThreadPoolExecutor(max_workers=producers) as executor:
+            list(executor.map(produce, range(producers)))
+        return writer.stats()
+
+
+def main(argv=None):
+    """
+    Compares commit-per-row (--batch 1) with group commit for concurrent producers.
+    """
+    parser = argparse.ArgumentParser(description="Measure group commit throughput and latency.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--producers", type=int, default=16, help="threads submitting writes")
+    parser.add_argument("--writes", type=int, default=500, help="writes per producer")
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, MAX_BATCH], help="max batch sizes to try")
+    parser.add_argument("--delay-ms", type=float, default=MAX_DELAY_MS)
+    args = parser.parse_args(argv)
+
+    for max_batch in args.batch:
+        stats = _benchmark(args.db, args.producers, args.writes, max_batch, args.delay_ms)
+        print(f"batch <= {max_batch}: {stats['committed']} writes in {stats['batches']} commits, "
+              f"{stats['writes_per_second']} writes/s, p50 {stats['p50_ms']} ms, p99 {stats['p99_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+import argparse
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+SLOW_MS = 100  # Statements slower than this are logged with their query plan
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)  # Histogram bounds, seconds
+
+log = logging.getLogger("sms.sql")
+_registry = None  # The active Registry, or None when instrumentation is off
+
+
+class StatementStats:
+    __slots__ = ("calls", "seconds", "rows", "buckets", "max_seconds")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.max_seconds = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # the last bucket is +Inf
+
+
+class Registry:
+    """
+    Per-statement call counts, rows, total time and latency histograms, keyed by the SQL text
+    with its whitespace collapsed. Statements slower than slow_ms are logged with EXPLAIN QUERY PLAN.
+    """
+
+    def __init__(self, slow_ms=SLOW_MS):
+        self.slow_seconds = slow_ms / 1000
+        self.started_at = time.time()
+        self._stats = {}
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def _key(self, sql):
+        key = self._keys.get(sql)
+        if key is None:
+            key = self._keys[sql] = " ".join(sql.split())
+        return key
+
+    def observe(self, conn, sql, params, seconds, rows):
+        key = self._key(sql)
+        bucket = next((i for i, bound in enumerate(BUCKETS) if seconds <= bound), len(BUCKETS))
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = StatementStats()
+            stats.calls += 1
+            stats.seconds += seconds
+            stats.rows += max(rows, 0)
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.buckets[bucket] += 1
+        if seconds >= self.slow_seconds:
+            log.warning("slow query (%.1f ms, %d rows): %s params=%r\n%s", seconds * 1000, rows, key, params,
+                        _query_plan(conn, sql, params))
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.started_at = time.time()
+
+    def snapshot(self):
+        """
+        The statistics as a dict: {sql: {calls, rows, seconds, mean_ms, max_ms, buckets}}, slowest total first.
+        """
+        with self._lock:
+            items = [(key, stats.calls, stats.rows, stats.seconds, stats.max_seconds, list(stats.buckets))
+                     for key, stats in self._stats.items()]
+        items.sort(key=lambda item: -item[3])
+        return {key: {"calls": calls, "rows": rows, "seconds": round(seconds, 6),
+                      "mean_ms": round(seconds / calls * 1000, 3), "max_ms": round(max_seconds * 1000, 3),
+                      "buckets": dict(zip([str(bound) for bound in BUCKETS] + ["+Inf"], buckets))}
+                for key, calls, rows, seconds, max_seconds, buckets in items}
+
+    def to_json(self):
+        return json.dumps({"since": self.started_at, "statements": self.snapshot()}, indent=2)
+
+    def to_prometheus(self):
+        """
+        The statistics in the Prometheus text exposition format.
+        """
+        lines = ["# HELP sms_sql_duration_seconds Time spent executing and fetching each statement.",
+                 "# TYPE sms_sql_duration_seconds histogram"]
+        rows = ["# HELP sms_sql_rows_total Rows returned or changed by each statement.",
+                "# TYPE sms_sql_rows_total counter"]
+        for key, stats in self.snapshot().items():
+            label = 'statement="' + key.replace("\\", "\\\\").replace('"', '\\"') + '"'
+            cumulative = 0
+            for bound, count in stats["buckets"].items():
+                cumulative += count
+                lines.append(f'sms_sql_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f"sms_sql_duration_seconds_sum{{{label}}} {stats['seconds']}")
+            lines.append(f"sms_sql_duration_seconds_count{{{label}}} {stats['calls']}")
+            rows.append(f"sms_sql_rows_total{{{label}}} {stats['rows']}")
+        return "\n".join(lines + rows) + "\n"
+
+
+def _query_plan(conn, sql, params):
+    try:
+        # Through the base class, so the EXPLAIN itself is not instrumented
+        plan = sqlite3.Connection.execute(conn, f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    except (sqlite3.Error, ValueError):
+        return "  (no query plan)"
+    return "\n".join(f"  {row[-1]}" for row in plan) or "  (no query plan)"
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """
+    A cursor that times each statement from execute() until its last row is fetched (or the
+    cursor moves on), counts the rows, and reports both to the active Registry.
+    """
+
+    _call = None  # [sql, params, seconds so far, rows] of the statement being read
+
+    def _finish(self):
+        call, self._call = self._call, None
+        if call is not None and _registry is not None:
+            _registry.observe(self.connection, *call)
+
+    def _add(self, seconds, rows):
+        if self._call is not None:
+            self._call[2] += seconds
+            self._call[3] += rows
+
+    def execute(self, sql, params=()):
+        self._finish()
+        start = time.perf_counter()
+        super().execute(sql, params)
+        self._call = [sql, params, time.perf_counter() - start, 0]
+        if self.description is None:  # no result rows to wait for
+            self._call[3] = self.rowcount
+            self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._finish()
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_params)
+        self._call = [sql, (), time.perf_counter() - start, self.rowcount]
+        self._finish()
+        return self
+
+    def executescript(self, script):
+        self._finish()
+        return super().executescript(script)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._add(time.perf_counter() - start, row is not None)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        start = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._add(time.perf_counter() - start, len(rows))
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._add(time.perf_counter() - start, len(rows))
+        self._finish()
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._add(time.perf_counter() - start, 0)
+            self._finish()
+            raise
+        self._add(time.perf_counter() - start, 1)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:  # the connection may already be closed
+            pass
+
+
+class Connection(sqlite3.Connection):
+    """
+    sqlite3.Connection with no behaviour of its own, except that it accepts attributes (the lookup
+    cache remembers which database a connection is on this way).
+    """
+
+
+class InstrumentedConnection(Connection):
+    """
+    A connection whose cursors, including those made by execute(), are InstrumentedCursors.
+    """
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+
+def connection_factory():
+    """
+    The factory db.connect passes to sqlite3.connect: plain connections unless instrumentation
+    is on, so there is no per-statement cost when it is off.
+    """
+    return InstrumentedConnection if _registry is not None else Connection
+
+
+def enabled():
+    return _registry is not None
+
+
+def registry():
+    return _registry
+
+
+def enable(slow_ms=SLOW_MS, slow_log=None):
+    """
+    Turns instrumentation on for connections opened from now on. Slow statements go to the
+    "sms.sql" logger, which writes to `slow_log` (or stderr) unless it is configured elsewhere.
+    """
+    global _registry
+    if _registry is None:
+        _registry = Registry(slow_ms)
+    if not log.handlers:
+        handler = logging.FileHandler(slow_log) if slow_log else logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        log.addHandler(handler)
+        log.propagate = False
+    return _registry
+
+
+def disable():
+    """
+    Stops recording; connections opened while it was on keep their cursors but record nothing.
+    """
+    global _registry
+    _registry = None
+
+
+def dump(path):
+    """
+    Writes the statistics to `path`: JSON for a .json file, Prometheus text format otherwise.
+    """
+    if _registry is None:
+        return
+    with open(path, "w") as f:
+        f.write(_registry.to_json() if path.endswith(".json") else _registry.to_prometheus())
+
+
+# SMS_INSTRUMENT=1 turns instrumentation on for any script (SMS_SLOW_MS, SMS_SLOW_LOG and
+# SMS_SQL_STATS, a file written at exit, are optional)
+if os.environ.get("SMS_INSTRUMENT"):
+    enable(float(os.environ.get("SMS_SLOW_MS", SLOW_MS)), os.environ.get("SMS_SLOW_LOG"))
+    if os.environ.get("SMS_SQL_STATS"):
+        atexit.register(dump, os.environ["SMS_SQL_STATS"])
+
+
+def main(argv=None):
+    """
+    Summarizes a JSON stats file written through SMS_SQL_STATS, slowest statements first.
+    """
+    parser = argparse.ArgumentParser(description="Show the slowest statements in a JSON SQL stats file.")
+    parser.add_argument("stats", help="JSON file written with SMS_SQL_STATS=<file>.json")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with open(args.stats) as f:
+        statements = json.load(f)["statements"]
+    print(f"{'total s':>9} {'calls':>7} {'mean ms':>9} {'max ms':>9} {'rows':>9}  statement")
+    for sql, stats in list(statements.items())[:args.top]:
+        print(f"{stats['seconds']:9.3f} {stats['calls']:7} {stats['mean_ms']:9.3f} {stats['max_ms']:9.3f} "
+              f"{stats['rows']:9}  {sql[:100]}")
+
+
+if __name__ == "__main__":
+    main()
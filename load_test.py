@@ -0,0 +1,150 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+CLIENTS = 200  # Concurrent keep-alive connections
+REQUESTS = 50  # Requests sent by each client
+WRITE_RATIO = 0.1  # Share of requests that are writes
+SEED_STUDENTS = 100  # Students created first when the database has none
+SEARCH_TERMS = ["an", "mar", "son", "lee", "ada", "jo"]
+
+
+class Client:
+    """
+    A minimal HTTP/1.1 client speaking JSON over one keep-alive connection.
+    """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, payload=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                          f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        await self.writer.drain()
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+        headers = dict((name.strip().lower(), value.strip())
+                       for name, _, value in (line.partition(":") for line in header_lines))
+        data = await self.reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return int(status_line.split(" ")[1]), json.loads(data) if data else None
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+async def prepare(client):
+    """
+    Returns the (student ids, class ids) to aim requests at, creating some students if there are none.
+    """
+    _, students = await client.request("GET", "/students?limit=1000")
+    student_ids = [row["id"] for row in students["rows"]]
+    _, classes = await client.request("GET", "/classes?limit=1000")
+    class_ids = [row["id"] for row in classes["rows"]]
+    if not class_ids:
+        _, created = await client.request("POST", "/classes", {"class_name": "Load test", "grade_level": 1})
+        class_ids = [created["id"]]
+    for n in range(SEED_STUDENTS - len(student_ids)):
+        _, created = await client.request("POST", "/students", {"name": f"Load test student {n}"})
+        student_ids.append(created["id"])
+        await client.request("POST", f"/classes/{class_ids[0]}/students", {"student_id": created["id"]})
+    return student_ids, class_ids
+
+
+def pick_request(student_ids, class_ids, write_ratio):
+    """
+    A random (kind, method, path, payload) in roughly the mix a school office generates.
+    """
+    student_id = random.choice(student_ids)
+    if random.random() < write_ratio:
+        if random.random() < 0.5:
+            day = f"2025-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}"
+            return "write", "POST", "/attendance", {"student_id": student_id, "present": random.random() < 0.9, "date": day}
+        return "write", "POST", "/grades", {"student_id": student_id, "subject": "Math", "grade": random.randint(1, 6)}
+    choice = random.random()
+    if choice < 0.4:
+        return "read", "GET", f"/students/{student_id}", None
+    if choice < 0.6:
+        return "read", "GET", f"/students/{student_id}/grades", None
+    if choice < 0.75:
+        return "read", "GET", f"/students?after={max(student_id - 20, 0)}&limit=20", None
+    if choice < 0.9:
+        return "read", "GET", f"/students/search?q={random.choice(SEARCH_TERMS)}", None
+    return "read", "GET", f"/classes/{random.choice(class_ids)}/students", None
+
+
+async def run_client(host, port, requests, student_ids, class_ids, write_ratio, latencies, errors):
+    client = Client(host, port)
+    try:
+        for _ in range(requests):
+            kind, method, path, payload = pick_request(student_ids, class_ids, write_ratio)
+            start = time.perf_counter()
+            try:
+                status, _ = await client.request(method, path, payload)
+            except (OSError, asyncio.IncompleteReadError) as e:
+                errors.append(f"{method} {path}: {e!r}")
+                client.close()
+                continue
+            latencies[kind].append(time.perf_counter() - start)
+            if status >= 400:
+                errors.append(f"{method} {path}: HTTP {status}")
+    finally:
+        client.close()
+
+
+def percentile(values, share):
+    return values[min(int(len(values) * share), len(values) - 1)] if values else 0.0
+
+
+async def load_test(host, port, clients, requests, write_ratio):
+    setup = Client(host, port)
+    student_ids, class_ids = await prepare(setup)
+    setup.close()
+
+    latencies = {"read": [], "write": []}
+    errors = []
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(host, port, requests, student_ids, class_ids, write_ratio, latencies, errors)
+                           for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"{clients} clients x {requests} requests: {total} responses in {elapsed:.2f}s "
+          f"({total / elapsed:.0f} requests/s), {len(errors)} errors")
+    for kind, values in latencies.items():
+        values.sort()
+        print(f"  {kind:5} {len(values):6}  p50 {percentile(values, 0.50) * 1000:7.1f} ms"
+              f"  p95 {percentile(values, 0.95) * 1000:7.1f} ms  p99 {percentile(values, 0.99) * 1000:7.1f} ms"
+              f"  max {(values[-1] if values else 0) * 1000:7.1f} ms")
+    for error in errors[:10]:
+        print(f"  {error}")
+    return not errors
+
+
+def main(argv=None):
+    """
+    Drives a running api_server.py with many concurrent clients and reports throughput and latency.
+    """
+    parser = argparse.ArgumentParser(description="Load-test a local api_server.py instance.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--clients", type=int, default=CLIENTS)
+    parser.add_argument("--requests", type=int, default=REQUESTS, help="requests per client")
+    parser.add_argument("--write-ratio", type=float, default=WRITE_RATIO)
+    args = parser.parse_args(argv)
+    ok = asyncio.run(load_test(args.host, args.port, args.clients, args.requests, args.write_ratio))
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
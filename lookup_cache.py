@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_SIZE = 4096  # Entries kept per cache before the least recently used one is dropped
+CACHE_TTL = 60.0  # Seconds an entry is trusted; bounds how long writes by other processes go unseen
+
+enabled = os.environ.get("SMS_CACHE", "1") != "0"  # SMS_CACHE=0 turns caching off, e.g. to compare timings
+
+
+class LRUCache:
+    """
+    A thread-safe, bounded LRU cache whose entries expire after `ttl` seconds.
+
+    Values are loaded on a miss by the caller's function; None is never cached. invalidate()
+    bumps a generation counter, so a load that raced with an invalidation is not stored.
+    """
+
+    def __init__(self, name, size=CACHE_SIZE, ttl=CACHE_TTL):
+        self.name = name
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, load):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+        value = load()
+        if value is not None:
+            with self._lock:
+                if generation == self._generation:
+                    self._entries[key] = (now + self.ttl, value)
+                    self._entries.move_to_end(key)
+                    if len(self._entries) > self.size:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+        return value
+
+    def invalidate(self, key=None):
+        """
+        Drops one key, or every entry when no key is given.
+        """
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                    "evictions": self.evictions, "invalidations": self.invalidations}
+
+
+students = LRUCache("student_by_id")
+class_list = LRUCache("class_list", size=64)
+classes_by_name = LRUCache("class_by_name")
+subject_ids = LRUCache("subject_id_by_name", size=1024)  # Subjects are never renamed or deleted
+CACHES = [students, class_list, classes_by_name, subject_ids]
+
+
+def namespace(conn):
+    """
+    The database file `conn` is on, so connections to the same file share entries.
+    """
+    try:
+        return conn.cache_namespace
+    except AttributeError:
+        pass
+    path = conn.execute("PRAGMA database_list").fetchone()[2] or f":memory:{id(conn)}"
+    try:
+        conn.cache_namespace = path
+    except AttributeError:  # a plain sqlite3.Connection; resolved again next time
+        pass
+    return path
+
+
+def cached(cache, conn, key, load):
+    """
+    cache.get for `key` on conn's database. Reads inside an open transaction bypass the cache,
+    since they may see rows that are later rolled back.
+    """
+    if not enabled or conn.in_transaction:
+        return load()
+    return cache.get((namespace(conn), key), load)
+
+
+def _defer(conn, cache, key):
+    # Until conn commits, readers on other connections still see the old row and may cache it
+    # again, so the invalidation is repeated by committed(conn)
+    if not conn.in_transaction:
+        return
+    try:
+        conn.cache_pending.append((cache, key))
+    except AttributeError:
+        try:
+            conn.cache_pending = [(cache, key)]
+        except AttributeError:  # a plain sqlite3.Connection cannot hold the list
+            pass
+
+
+def invalidate(cache, conn, key):
+    """
+    Drops `key` from `cache` now and, if conn has a transaction open, again once it commits.
+    """
+    if enabled:
+        cache.invalidate((namespace(conn), key))
+        _defer(conn, cache, (namespace(conn), key))
+
+
+def clear(conn=None):
+    """
+    Empties every cache, e.g. after a bulk change that bypassed the repositories; with `conn`
+    in an open transaction, again once it commits.
+    """
+    for cache in CACHES:
+        cache.invalidate()
+    if conn is not None:
+        _defer(conn, None, None)
+
+
+def committed(conn):
+    """
+    Repeats the invalidations deferred while conn's transaction was open. Call it after the
+    outermost commit (or rollback) of a connection that writes through the repositories.
+    """
+    pending = getattr(conn, "cache_pending", None)
+    if not pending:
+        return
+    conn.cache_pending = []
+    for cache, key in pending:
+        for target in CACHES if cache is None else [cache]:
+            target.invalidate(key)
+
+
+def stats():
+    return {cache.name: cache.stats() for cache in CACHES}
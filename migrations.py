@@ -0,0 +1,544 @@
+import sqlite3
+import sys
+
+from dates import DAY_NUMBER, TODAY
+from db import connect
+
+
+def _shared_schema(c):
+    """
+    Creates the tables of both menus so they, and tools that do not run a menu's
+    create_tables, work against the same database file.
+    """
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS Students (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            registration_date TEXT NOT NULL DEFAULT CURRENT_DATE
+        )
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS Grades (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            subject TEXT NOT NULL,
+            grade INTEGER NOT NULL,
+            date TEXT NOT NULL DEFAULT CURRENT_DATE,
+            FOREIGN KEY (student_id) REFERENCES Students(id)
+        )
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS Attendance (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            date TEXT NOT NULL DEFAULT CURRENT_DATE,
+            present BOOLEAN NOT NULL,
+            FOREIGN KEY (student_id) REFERENCES Students(id)
+        )
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS Grades_Scale (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            grade_level INTEGER NOT NULL UNIQUE
+        )
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS Classes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            class_name TEXT NOT NULL UNIQUE,
+            grade_level INTEGER NOT NULL REFERENCES Grades_Scale(grade_level)
+        )
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS Student_Class (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL REFERENCES Students(id),
+            class_id INTEGER NOT NULL REFERENCES Classes(id),
+            FOREIGN KEY (student_id, class_id)
+                REFERENCES Students(id, id)
+                ON DELETE CASCADE
+                ON UPDATE CASCADE
+                DEFERRABLE INITIALLY DEFERRED
+        )
+    """)
+
+
+def _lookup_indexes(c):
+    """
+    Adds covering indexes for the per-student and per-class lookups behind the menus.
+    """
+    c.execute("CREATE INDEX IF NOT EXISTS idx_grades_student_subject ON Grades (student_id, subject, grade)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_attendance_student_date ON Attendance (student_id, date, present)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_student_class_student ON Student_Class (student_id, class_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_student_class_class ON Student_Class (class_id, student_id)")
+
+
+def _student_search_index(c):
+    """
+    Adds a trigram FTS5 index over student names, kept in sync with Students by triggers,
+    plus a case-insensitive name index for prefix searches.
+    """
+    c.execute("CREATE INDEX IF NOT EXISTS idx_students_name ON Students (name COLLATE NOCASE)")
+    c.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS Students_FTS USING fts5(
+            name, content='Students', content_rowid='id', tokenize='trigram'
+        )
+    """)
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS students_fts_insert AFTER INSERT ON Students BEGIN
+            INSERT INTO Students_FTS (rowid, name) VALUES (new.id, new.name);
+        END
+    """)
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS students_fts_delete AFTER DELETE ON Students BEGIN
+            INSERT INTO Students_FTS (Students_FTS, rowid, name) VALUES ('delete', old.id, old.name);
+        END
+    """)
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS students_fts_update AFTER UPDATE OF name ON Students BEGIN
+            INSERT INTO Students_FTS (Students_FTS, rowid, name) VALUES ('delete', old.id, old.name);
+            INSERT INTO Students_FTS (rowid, name) VALUES (new.id, new.name);
+        END
+    """)
+    c.execute("INSERT INTO Students_FTS (Students_FTS) VALUES ('rebuild')")
+
+
+def _foreign_key_repairs(c):
+    """
+    Makes the schema valid under PRAGMA foreign_keys = ON: Student_Class loses its composite
+    key into Students(id, id), which SQLite rejects as a foreign key mismatch, and
+    Grades_Scale gets the grade levels 1-6 that Classes.grade_level refers to.
+    """
+    c.execute("""
+        CREATE TABLE Student_Class_New (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL REFERENCES Students(id),
+            class_id INTEGER NOT NULL REFERENCES Classes(id)
+        )
+    """)
+    c.execute("INSERT INTO Student_Class_New (id, student_id, class_id) SELECT id, student_id, class_id FROM Student_Class")
+    c.execute("DROP TABLE Student_Class")
+    c.execute("ALTER TABLE Student_Class_New RENAME TO Student_Class")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_student_class_student ON Student_Class (student_id, class_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_student_class_class ON Student_Class (class_id, student_id)")
+    c.executemany("INSERT OR IGNORE INTO Grades_Scale (grade_level) VALUES (?)", [(level,) for level in range(1, 7)])
+
+
+def _quarantine(c, table, columns, where, reason):
+    """
+    Moves the rows of `table` matching `where` into Quarantined_<table> (same columns, as stored,
+    plus the reason), so a migration that cannot keep them in place keeps them for review. Returns the count.
+    """
+    c.execute(f"CREATE TABLE IF NOT EXISTS Quarantined_{table} ({', '.join(columns)}, reason TEXT NOT NULL)")
+    moved = c.execute(f"INSERT INTO Quarantined_{table} SELECT {', '.join(columns)}, ? FROM {table} WHERE {where}",
+                      (reason,)).rowcount
+    if moved:
+        c.execute(f"DELETE FROM {table} WHERE {where}")
+        print(f"Moved {moved} {table} rows to Quarantined_{table}: {reason}", file=sys.stderr)
+    return moved
+
+
+def _unique_daily_attendance(c):
+    """
+    Makes (student_id, date) unique on Attendance so roll calls can be re-run as upserts.
+    Older duplicate records for the same student and day are moved to Quarantined_Attendance.
+    """
+    _quarantine(c, "Attendance", ["id", "student_id", "date", "present"],
+                "id NOT IN (SELECT max(id) FROM Attendance GROUP BY student_id, date)", "duplicate daily record")
+    c.execute("DROP INDEX IF EXISTS idx_attendance_student_date")
+    c.execute("CREATE UNIQUE INDEX idx_attendance_student_date ON Attendance (student_id, date)")
+
+
+def _grade_stats(c):
+    """
+    Adds Student_Grade_Stats, per-student per-subject grade aggregates kept current by triggers on Grades.
+
+    Inserts fold the new grade in directly; deletes and updates recompute the affected
+    (student_id, subject) groups, since a minimum or maximum cannot be un-applied.
+    """
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS Student_Grade_Stats (
+            student_id INTEGER NOT NULL,
+            subject TEXT NOT NULL,
+            grade_count INTEGER NOT NULL,
+            grade_sum INTEGER NOT NULL,
+            min_grade INTEGER NOT NULL,
+            max_grade INTEGER NOT NULL,
+            PRIMARY KEY (student_id, subject)
+        ) WITHOUT ROWID
+    """)
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS grade_stats_insert AFTER INSERT ON Grades BEGIN
+            INSERT INTO Student_Grade_Stats (student_id, subject, grade_count, grade_sum, min_grade, max_grade)
+            VALUES (new.student_id, new.subject, 1, new.grade, new.grade, new.grade)
+            ON CONFLICT (student_id, subject) DO UPDATE SET
+                grade_count = grade_count + 1,
+                grade_sum = grade_sum + excluded.grade_sum,
+                min_grade = min(min_grade, excluded.min_grade),
+                max_grade = max(max_grade, excluded.max_grade);
+        END
+    """)
+    regroup = """
+        DELETE FROM Student_Grade_Stats WHERE student_id = {row}.student_id AND subject = {row}.subject;
+        INSERT INTO Student_Grade_Stats (student_id, subject, grade_count, grade_sum, min_grade, max_grade)
+        SELECT student_id, subject, count(*), sum(grade), min(grade), max(grade)
+        FROM Grades WHERE student_id = {row}.student_id AND subject = {row}.subject
+        GROUP BY student_id, subject;
+    """
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS grade_stats_delete AFTER DELETE ON Grades BEGIN
+            {regroup.format(row='old')}
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS grade_stats_update AFTER UPDATE OF student_id, subject, grade ON Grades BEGIN
+            {regroup.format(row='old')}
+            {regroup.format(row='new')}
+        END
+    """)
+    c.execute("DELETE FROM Student_Grade_Stats")
+    c.execute("""
+        INSERT INTO Student_Grade_Stats (student_id, subject, grade_count, grade_sum, min_grade, max_grade)
+        SELECT student_id, subject, count(*), sum(grade), min(grade), max(grade)
+        FROM Grades GROUP BY student_id, subject
+    """)
+
+
+# Tables whose changes are captured in Change_Log, with the code stored for each; never renumber
+CHANGE_TABLES = {"Students": 1, "Grades": 2, "Attendance": 3, "Student_Class": 4, "Subjects": 5}
+
+
+def _change_log_triggers(c, table):
+    name, code = table.lower(), CHANGE_TABLES[table]
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {name}_log_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO Change_Log (table_code, op, row_id) VALUES ({code}, 'I', new.id);
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {name}_log_update AFTER UPDATE ON {table} BEGIN
+            INSERT INTO Change_Log (table_code, op, row_id) SELECT {code}, 'D', old.id WHERE old.id != new.id;
+            INSERT INTO Change_Log (table_code, op, row_id) VALUES ({code}, 'U', new.id);
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {name}_log_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO Change_Log (table_code, op, row_id) VALUES ({code}, 'D', old.id);
+        END
+    """)
+
+
+def _change_log(c):
+    """
+    Adds Change_Log, one compact (seq, table code, op, row id) entry per inserted, updated or
+    deleted row of the captured tables, and Sync_Cursors, the last seq each consumer has exported.
+
+    Only ids are logged; an export reads the rows' current values, so each row is sent once
+    however often it changed. AUTOINCREMENT keeps seq from being reused after pruning.
+    """
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS Change_Log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_code INTEGER NOT NULL,
+            op TEXT NOT NULL CHECK (op IN ('I', 'U', 'D')),
+            row_id INTEGER NOT NULL
+        )
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS Sync_Cursors (
+            consumer TEXT PRIMARY KEY,
+            seq INTEGER NOT NULL,
+            updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    for table in ("Students", "Grades", "Attendance", "Student_Class"):
+        _change_log_triggers(c, table)
+
+
+def _rebuild_table(c, table, create, select=None):
+    """
+    Replaces `table` with the table `create` defines (its {name} placeholder is filled in),
+    keeping rows, AUTOINCREMENT counter, indexes and triggers, as SQLite's ALTER TABLE docs describe.
+    Columns the old table lacks get their defaults; when columns are converted, `select` reads
+    the old table's rows in the new table's column order.
+    """
+    extras = [sql for (sql,) in c.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+        (table,))]
+    sequence = c.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+    old_columns = {row[1] for row in c.execute(f"PRAGMA table_info({table})")}
+    c.execute(create.format(name=f"{table}_New"))
+    columns = ", ".join(row[1] for row in c.execute(f"PRAGMA table_info({table}_New)")
+                        if select or row[1] in old_columns)
+    c.execute(f"INSERT INTO {table}_New ({columns}) {select or f'SELECT {columns} FROM {table}'}")
+    c.execute(f"DROP TABLE {table}")
+    c.execute(f"ALTER TABLE {table}_New RENAME TO {table}")
+    if sequence:  # ids of deleted rows are never handed out again, which the change log relies on
+        c.execute("UPDATE sqlite_sequence SET seq = max(seq, ?) WHERE name = ?", (sequence[0], table))
+    for sql in extras:
+        c.execute(sql)
+
+
+def _cascading_deletes(c):
+    """
+    Rebuilds Grades, Attendance and Student_Class so their student_id foreign keys are
+    ON DELETE CASCADE: deleting a Students row removes the student's records through the
+    student_id indexes. Cascaded deletes fire the tables' triggers like any other delete.
+    """
+    _rebuild_table(c, "Grades", """
+        CREATE TABLE {name} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL REFERENCES Students(id) ON DELETE CASCADE,
+            subject TEXT NOT NULL,
+            grade INTEGER NOT NULL,
+            date TEXT NOT NULL DEFAULT CURRENT_DATE
+        )
+    """)
+    _rebuild_table(c, "Attendance", """
+        CREATE TABLE {name} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL REFERENCES Students(id) ON DELETE CASCADE,
+            date TEXT NOT NULL DEFAULT CURRENT_DATE,
+            present BOOLEAN NOT NULL
+        )
+    """)
+    _rebuild_table(c, "Student_Class", """
+        CREATE TABLE {name} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL REFERENCES Students(id) ON DELETE CASCADE,
+            class_id INTEGER NOT NULL REFERENCES Classes(id)
+        )
+    """)
+
+
+def _subject_ids(c):
+    """
+    Moves subject names into a Subjects table and dictionary-encodes Grades.subject as the
+    integer subject_id. Student_Grade_Stats, its triggers and the per-student grade index are
+    re-keyed on subject_id; Subjects changes are captured in the change log.
+    """
+    for trigger in ("grade_stats_insert", "grade_stats_delete", "grade_stats_update"):
+        c.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    c.execute("DROP INDEX IF EXISTS idx_grades_student_subject")
+    c.execute("DROP TABLE IF EXISTS Student_Grade_Stats")
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS Subjects (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+    """)
+    # Names lose surrounding whitespace as in SubjectRepo.resolve, so 'math ' and 'math' are one subject
+    trimmed = "trim({}, char(32, 9, 10, 11, 12, 13))"
+    c.execute(f"INSERT OR IGNORE INTO Subjects (name) SELECT DISTINCT {trimmed.format('subject')} FROM Grades ORDER BY 1")
+    _rebuild_table(c, "Grades", """
+        CREATE TABLE {name} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL REFERENCES Students(id) ON DELETE CASCADE,
+            subject_id INTEGER NOT NULL REFERENCES Subjects(id),
+            grade INTEGER NOT NULL,
+            date TEXT NOT NULL DEFAULT CURRENT_DATE
+        )
+    """, select=f"SELECT g.id, g.student_id, s.id, g.grade, g.date "
+                f"FROM Grades g JOIN Subjects s ON s.name = {trimmed.format('g.subject')}")
+    c.execute("CREATE INDEX idx_grades_student_subject ON Grades (student_id, subject_id, grade)")
+    _change_log_triggers(c, "Subjects")
+
+    c.execute("""
+        CREATE TABLE Student_Grade_Stats (
+            student_id INTEGER NOT NULL,
+            subject_id INTEGER NOT NULL,
+            grade_count INTEGER NOT NULL,
+            grade_sum INTEGER NOT NULL,
+            min_grade INTEGER NOT NULL,
+            max_grade INTEGER NOT NULL,
+            PRIMARY KEY (student_id, subject_id)
+        ) WITHOUT ROWID
+    """)
+    c.execute("""
+        CREATE TRIGGER grade_stats_insert AFTER INSERT ON Grades BEGIN
+            INSERT INTO Student_Grade_Stats (student_id, subject_id, grade_count, grade_sum, min_grade, max_grade)
+            VALUES (new.student_id, new.subject_id, 1, new.grade, new.grade, new.grade)
+            ON CONFLICT (student_id, subject_id) DO UPDATE SET
+                grade_count = grade_count + 1,
+                grade_sum = grade_sum + excluded.grade_sum,
+                min_grade = min(min_grade, excluded.min_grade),
+                max_grade = max(max_grade, excluded.max_grade);
+        END
+    """)
+    regroup = """
+        DELETE FROM Student_Grade_Stats WHERE student_id = {row}.student_id AND subject_id = {row}.subject_id;
+        INSERT INTO Student_Grade_Stats (student_id, subject_id, grade_count, grade_sum, min_grade, max_grade)
+        SELECT student_id, subject_id, count(*), sum(grade), min(grade), max(grade)
+        FROM Grades WHERE student_id = {row}.student_id AND subject_id = {row}.subject_id
+        GROUP BY student_id, subject_id;
+    """
+    c.execute(f"""
+        CREATE TRIGGER grade_stats_delete AFTER DELETE ON Grades BEGIN
+            {regroup.format(row='old')}
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER grade_stats_update AFTER UPDATE OF student_id, subject_id, grade ON Grades BEGIN
+            {regroup.format(row='old')}
+            {regroup.format(row='new')}
+        END
+    """)
+    c.execute("""
+        INSERT INTO Student_Grade_Stats (student_id, subject_id, grade_count, grade_sum, min_grade, max_grade)
+        SELECT student_id, subject_id, count(*), sum(grade), min(grade), max(grade)
+        FROM Grades GROUP BY student_id, subject_id
+    """)
+
+
+def _day_number_dates(c):
+    """
+    Stores Grades.date and Attendance.date as integer days since 1970-01-01 (dates.EPOCH),
+    two or three bytes instead of ten, with a CHECK that rejects anything but an integer, and
+    adds (date, student_id) indexes so date ranges are read as index range scans.
+
+    Only YYYY-MM-DD text naming a real day is converted. Anything else ('2024', 'now',
+    '2024-02-30', '2024-01-05 08:00', ...) is moved unchanged into Quarantined_Grades /
+    Quarantined_Attendance to be fixed and re-entered by hand.
+    """
+    # julianday() reads many other forms and rolls 2024-02-30 over into March, so a strict date is
+    # one that comes back unchanged from the round trip
+    undated = "date IS NULL OR date IS NOT date(julianday(date))"
+    _quarantine(c, "Grades", ["id", "student_id", "subject_id", "grade", "date"], undated, "not a YYYY-MM-DD date")
+    _quarantine(c, "Attendance", ["id", "student_id", "date", "present"], undated, "not a YYYY-MM-DD date")
+    _rebuild_table(c, "Grades", f"""
+        CREATE TABLE {{name}} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL REFERENCES Students(id) ON DELETE CASCADE,
+            subject_id INTEGER NOT NULL REFERENCES Subjects(id),
+            grade INTEGER NOT NULL,
+            date INTEGER NOT NULL DEFAULT ({TODAY}) CHECK (typeof(date) = 'integer')
+        )
+    """, select=f"SELECT id, student_id, subject_id, grade, {DAY_NUMBER.format('date')} FROM Grades")
+    _rebuild_table(c, "Attendance", f"""
+        CREATE TABLE {{name}} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL REFERENCES Students(id) ON DELETE CASCADE,
+            date INTEGER NOT NULL DEFAULT ({TODAY}) CHECK (typeof(date) = 'integer'),
+            present BOOLEAN NOT NULL
+        )
+    """, select=f"SELECT id, student_id, {DAY_NUMBER.format('date')}, present FROM Attendance")
+    c.execute("CREATE INDEX idx_grades_date ON Grades (date, student_id)")
+    # Attendance range queries read only present, so the index covers them
+    c.execute("CREATE INDEX idx_attendance_date ON Attendance (date, student_id, present)")
+
+
+# (version, description, step) - append new steps here, never edit or reorder applied ones
+MIGRATIONS = [
+    (1, "shared schema", _shared_schema),
+    (2, "foreign-key lookup indexes", _lookup_indexes),
+    (3, "student name search index", _student_search_index),
+    (4, "foreign key repairs", _foreign_key_repairs),
+    (5, "one attendance record per student per day", _unique_daily_attendance),
+    (6, "per-student grade aggregates", _grade_stats),
+    (7, "change log for incremental sync", _change_log),
+    (8, "cascade student deletes to their records", _cascading_deletes),
+    (9, "subjects as integer keys", _subject_ids),
+    (10, "dates as day numbers", _day_number_dates),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn, verbose=False):
+    """
+    Applies every migration newer than the database's PRAGMA user_version, each in its own
+    BEGIN IMMEDIATE transaction that re-checks the version, so processes starting together apply
+    each step once. Returns the resulting schema version.
+    """
+    version = schema_version(conn)
+    if version >= SCHEMA_VERSION:
+        return version
+
+    # Tables are rebuilt with CREATE/INSERT/DROP/RENAME, which must not fire foreign key actions
+    foreign_keys = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        for step_version, description, step in MIGRATIONS:
+            if step_version <= version:
+                continue
+            c = conn.cursor()
+            # Take the write lock first, then re-read the version: another process may have
+            # applied this step while we waited
+            c.execute("BEGIN IMMEDIATE")
+            try:
+                if schema_version(conn) >= step_version:
+                    conn.rollback()
+                    continue
+                step(c)
+                c.execute(f"PRAGMA user_version = {step_version}")
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+            version = step_version
+            if verbose:
+                print(f"Applied migration {step_version}: {description}")
+    finally:
+        conn.execute(f"PRAGMA foreign_keys = {foreign_keys}")
+    return schema_version(conn)
+
+
+# Queries run by the menu actions, keyed by the action that runs them
+MENU_QUERIES = {
+    "view_students": ("SELECT s.id, s.name, c.class_name FROM Students s "
+                      "LEFT JOIN Student_Class sc ON s.id = sc.student_id "
+                      "LEFT JOIN Classes c ON sc.class_id = c.id", ()),
+    "search_students": ("SELECT rowid FROM Students_FTS WHERE Students_FTS MATCH ? ORDER BY rank", ('"ann"',)),
+    "view_student_grades": ("SELECT * FROM Grades WHERE student_id = ?", (1,)),
+    "view_student_attendance": ("SELECT date, present FROM Attendance WHERE student_id = ? ORDER BY date", (1,)),
+    "add_grade (class lookup)": ("SELECT grade_level FROM Student_Class sc JOIN Classes c ON sc.class_id = c.id "
+                                 "WHERE sc.student_id = ?", (1,)),
+    "delete_student": ("DELETE FROM Students WHERE id = ?", (1,)),  # the plan includes the cascaded deletes
+    "view_students_in_class": ("SELECT s.id, s.name FROM Students s JOIN Student_Class sc ON s.id = sc.student_id "
+                               "WHERE sc.class_id = ?", (1,)),
+    "attendance_range": ("SELECT date, student_id, present FROM Attendance WHERE date BETWEEN ? AND ? "
+                         "ORDER BY date, student_id", (19000, 19006)),
+    "grades_for_term": ("SELECT date, student_id, subject_id, grade FROM Grades WHERE date BETWEEN ? AND ? "
+                        "ORDER BY date, student_id", (19000, 19089)),
+}
+
+
+def query_plans(conn):
+    """
+    Returns {action: [plan detail, ...]} from EXPLAIN QUERY PLAN for each menu query.
+    """
+    plans = {}
+    for action, (query, params) in MENU_QUERIES.items():
+        try:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+            plans[action] = [row[-1] for row in rows]
+        except sqlite3.OperationalError as e:
+            plans[action] = [f"error: {e}"]
+    return plans
+
+
+def print_query_plans(plans, title):
+    print(f"\n{title}")
+    for action, details in plans.items():
+        print(f"  {action}:")
+        for detail in details:
+            print(f"    {detail}")
+
+
+def main(db_path='schooldb.db'):
+    """
+    Upgrades a database in place, printing the menu query plans before and after.
+    """
+    conn = connect(db_path)
+    print_query_plans(query_plans(conn), f"Before (schema version {schema_version(conn)}):")
+    migrate(conn, verbose=True)
+    print_query_plans(query_plans(conn), f"After (schema version {schema_version(conn)}):")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,100 @@
+import argparse
+import csv
+import sys
+
+from csv_export import table_select
+from db import DB_PATH, connect
+
+PAGE_SIZE = 20  # Rows shown per page unless the user picks another size
+
+# Page queries for the scripted form, keyed by table: (select, key column)
+TABLE_PAGES = {
+    "students": ("SELECT * FROM Students", "id"),
+    "grades": table_select("grades"),
+    "attendance": table_select("attendance"),
+    "classes": ("SELECT * FROM Classes", "id"),
+}
+
+
+def fetch_page(cursor, select, key='id', after=None, before=None, limit=PAGE_SIZE, group_by=''):
+    """
+    Returns up to `limit` rows of `select` ordered by `key`, using keyset pagination.
+
+    `select` is a query without WHERE/ORDER BY whose first column is `key`. Rows after the
+    `after` key are returned, or the rows just before the `before` key when paging back,
+    so each page is an index range scan no matter how deep into the table it is.
+    """
+    if group_by:
+        group_by = f" GROUP BY {group_by}"
+    if before is not None:
+        cursor.execute(f"{select} WHERE {key} < ?{group_by} ORDER BY {key} DESC LIMIT ?", (before, limit))
+        return cursor.fetchall()[::-1]
+    if after is None:
+        cursor.execute(f"{select}{group_by} ORDER BY {key} LIMIT ?", (limit,))
+    else:
+        cursor.execute(f"{select} WHERE {key} > ?{group_by} ORDER BY {key} LIMIT ?", (after, limit))
+    return cursor.fetchall()
+
+
+def page_through(fetch, show, limit=PAGE_SIZE, empty_message="No rows found."):
+    """
+    Interactive pager: shows one page at a time through `show(rows)` and moves next/previous
+    from the first/last key on screen. `fetch(after=, before=, limit=)` returns a page whose
+    rows start with their key, such as the repositories' page() methods.
+    """
+    rows = fetch(limit=limit)
+    if not rows:
+        print(empty_message)
+        return
+    page = 1
+    while True:
+        show(rows)
+        choice = input(f"Page {page} - [n]ext, [p]revious, [s]ize <rows>, [q]uit: ").strip().lower()
+        if choice.startswith('n'):
+            next_rows = fetch(after=rows[-1][0], limit=limit)
+            if next_rows:
+                rows = next_rows
+                page += 1
+            else:
+                print("Already on the last page.")
+        elif choice.startswith('p'):
+            previous_rows = fetch(before=rows[0][0], limit=limit)
+            if previous_rows:
+                rows = previous_rows
+                page -= 1
+            else:
+                print("Already on the first page.")
+        elif choice.startswith('s'):
+            try:
+                limit = max(1, int(choice.split()[1]))
+            except (IndexError, ValueError):
+                print("Usage: s <rows per page>")
+                continue
+            rows = fetch(after=rows[0][0] - 1, limit=limit)
+        elif choice.startswith('q') or not choice:
+            return
+
+
+def main(argv=None):
+    """
+    Scripted form: prints one page of a table as CSV, e.g. `python pager.py students --limit 100 --after 500`.
+    """
+    parser = argparse.ArgumentParser(description="Print one page of a table as CSV using keyset pagination.")
+    parser.add_argument("table", choices=sorted(TABLE_PAGES))
+    parser.add_argument("--limit", type=int, default=PAGE_SIZE, help="rows to print")
+    parser.add_argument("--after", type=int, help="only rows with id greater than this")
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args(argv)
+
+    select, key = TABLE_PAGES[args.table]
+    conn = connect(args.db)
+    c = conn.cursor()
+    rows = fetch_page(c, select, key, after=args.after, limit=args.limit)
+    writer = csv.writer(sys.stdout)
+    writer.writerow([col[0] for col in c.description])
+    writer.writerows(rows)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
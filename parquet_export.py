@@ -0,0 +1,147 @@
+import argparse
+import json
+import os
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is only needed for Parquet export
+    pa = pq = None
+
+from dates import DAY_NUMBER
+from db import DB_PATH, connect
+
+BATCH_ROWS = 65536  # Rows per Arrow record batch (and Parquet row group); bounds memory use
+COMPRESSION = "zstd"
+STATE_FILE = "parquet_export_state.json"  # High-water marks of incremental exports, per table
+
+# Exports by name: (select with the key column first and no WHERE/ORDER BY, key column, [(field, Arrow type)]).
+# Arrow's date32 counts days since 1970-01-01 like Grades.date and Attendance.date; registration dates are converted.
+EXPORTS = {
+    "students": (f"SELECT id, name, {DAY_NUMBER.format('registration_date')} FROM Students", "id",
+                 [("id", "int64"), ("name", "string"), ("registration_date", "date32")]),
+    "grades": ("SELECT g.id, g.student_id, sub.name, g.grade, g.date "
+               "FROM Grades g JOIN Subjects sub ON sub.id = g.subject_id", "g.id",
+               [("id", "int64"), ("student_id", "int64"), ("subject", "string"), ("grade", "int16"),
+                ("date", "date32")]),
+    "attendance": ("SELECT id, student_id, date, present FROM Attendance", "id",
+                   [("id", "int64"), ("student_id", "int64"), ("date", "date32"), ("present", "bool")]),
+    "classes": ("SELECT id, class_name, grade_level FROM Classes", "id",
+                [("id", "int64"), ("class_name", "string"), ("grade_level", "int16")]),
+    "student_class": ("SELECT id, student_id, class_id FROM Student_Class", "id",
+                      [("id", "int64"), ("student_id", "int64"), ("class_id", "int64")]),
+    # One row per enrolment, with the student and class denormalized for analytics
+    "student_classes": (f"""
+        SELECT sc.id, s.id, s.name, {DAY_NUMBER.format('s.registration_date')}, c.id, c.class_name, c.grade_level
+        FROM Student_Class sc
+        JOIN Students s ON s.id = sc.student_id
+        JOIN Classes c ON c.id = sc.class_id
+    """, "sc.id", [("enrolment_id", "int64"), ("student_id", "int64"), ("name", "string"),
+                   ("registration_date", "date32"), ("class_id", "int64"), ("class_name", "string"),
+                   ("grade_level", "int16")]),
+}
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow")
+
+
+def _arrow_type(name):
+    return getattr(pa, "bool_" if name == "bool" else name)()
+
+
+def _column(values, name):
+    if name == "bool":  # SQLite stores booleans as 0/1
+        return pa.array(values, type=pa.int8()).cast(pa.bool_())
+    return pa.array(values, type=_arrow_type(name))
+
+
+def export_parquet(conn, name, filename, after=None, batch_rows=BATCH_ROWS, compression=COMPRESSION):
+    """
+    Streams export `name` into a Parquet file, one record batch of `batch_rows` at a time, so
+    memory stays bounded at any table size. With `after`, only rows whose key is greater are
+    written. Returns (rows written, last key written or `after`); no file is created for 0 rows.
+    """
+    _require_pyarrow()
+    select, key, fields = EXPORTS[name]
+    schema = pa.schema([(field, _arrow_type(type_name)) for field, type_name in fields])
+    where = f" WHERE {key} > ?" if after is not None else ""
+    cursor = conn.execute(f"{select}{where} ORDER BY {key}", (after,) if after is not None else ())
+    rows, last_key, writer = 0, after, None
+    try:
+        while True:
+            chunk = cursor.fetchmany(batch_rows)
+            if not chunk:
+                break
+            if writer is None:
+                writer = pq.ParquetWriter(filename, schema, compression=compression)
+            columns = [_column(values, type_name) for values, (_, type_name) in zip(zip(*chunk), fields)]
+            writer.write_batch(pa.RecordBatch.from_arrays(columns, schema=schema))
+            rows += len(chunk)
+            last_key = chunk[-1][0]
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows, last_key
+
+
+def load_state(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_state(path, state):
+    # Written to a temporary file first so a crash never leaves a half-written state file
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def export_incremental(conn, name, directory, state_path=None):
+    """
+    Exports only the rows added since the last incremental export of `name` into a new file in
+    `directory`, then advances the stored high-water mark. Returns (filename or None, rows).
+    """
+    state_path = state_path or os.path.join(directory, STATE_FILE)
+    state = load_state(state_path)
+    after = state.get(name, 0)
+    filename = os.path.join(directory, f"{name}_after_{after}.parquet")
+    rows, last_key = export_parquet(conn, name, filename, after=after)
+    if rows:
+        state[name] = last_key
+        save_state(state_path, state)
+    return (filename if rows else None), rows
+
+
+def main(argv=None):
+    """
+    Writes Parquet files for analytics, e.g. `python parquet_export.py attendance grades --incremental`.
+    """
+    parser = argparse.ArgumentParser(description="Export tables to Parquet with proper types.")
+    parser.add_argument("exports", nargs="+", choices=sorted(EXPORTS))
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--dir", default=".", help="output directory")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only rows with an id above the last incremental export's high-water mark")
+    parser.add_argument("--state", help=f"high-water mark file (default: <dir>/{STATE_FILE})")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.dir, exist_ok=True)
+    conn = connect(args.db)
+    for name in args.exports:
+        start = time.perf_counter()
+        if args.incremental:
+            filename, rows = export_incremental(conn, name, args.dir, args.state)
+        else:
+            filename = os.path.join(args.dir, f"{name}.parquet")
+            rows, _ = export_parquet(conn, name, filename)
+        print(f"{name}: {rows} rows" + (f" -> {filename}" if rows else "") + f" in {time.perf_counter() - start:.2f}s")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
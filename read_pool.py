@@ -0,0 +1,133 @@
+import argparse
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from db import BUSY_TIMEOUT_MS, CACHE_SIZE_KB, DB_PATH, MMAP_SIZE
+from instrument import connection_factory
+from reports import report_jobs
+
+POOL_SIZE = 4  # Read-only connections kept open
+MAX_LIFETIME = 300.0  # Seconds before a connection is closed and reopened
+
+
+class ReadPool:
+    """
+    A bounded pool of read-only connections (mode=ro URIs) for running report queries in parallel.
+
+    Under WAL, readers never block the writer or each other, so report threads can each check
+    out their own connection. Connections are health-checked on checkout and recycled after
+    max_lifetime seconds.
+    """
+
+    def __init__(self, path=None, size=POOL_SIZE, max_lifetime=MAX_LIFETIME):
+        self.path = path or DB_PATH
+        self.size = size
+        self.max_lifetime = max_lifetime
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+        self.opened = 0
+        self.recycled = 0
+
+    def _open(self):
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=BUSY_TIMEOUT_MS / 1000,
+                               check_same_thread=False, factory=connection_factory())
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+        conn.execute("PRAGMA query_only = ON")
+        self.opened += 1
+        return conn, time.monotonic()
+
+    def _healthy(self, conn, opened_at):
+        if time.monotonic() - opened_at > self.max_lifetime:
+            return False
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """
+        Checks out a connection, waiting up to `timeout` seconds when all `size` are in use.
+        """
+        if self._closed:
+            raise RuntimeError("Read pool is closed.")
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("No read connection available.")
+        entry = None
+        try:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                entry = self._open()
+            if not self._healthy(*entry):
+                entry[0].close()
+                entry = None  # so a failing _open() does not put the closed connection back
+                self.recycled += 1
+                entry = self._open()
+            yield entry[0]
+        finally:
+            if entry is not None:
+                if self._closed:
+                    entry[0].close()
+                else:
+                    self._idle.put(entry)
+            self._slots.release()
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def run_reports(pool, jobs, workers=None):
+    """
+    Runs `jobs` (callables taking a connection) on a thread pool, each on a pooled connection.
+    Returns their results in order.
+    """
+    def run(job):
+        with pool.connection() as conn:
+            return job(conn)
+
+    with ThreadPoolExecutor(max_workers=workers or pool.size) as executor:
+        return list(executor.map(run, jobs))
+
+
+def main(argv=None):
+    """
+    Measures report throughput as the number of parallel readers grows.
+    """
+    parser = argparse.ArgumentParser(description="Run report queries in parallel on read-only connections.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--rounds", type=int, default=4, help="times each report runs")
+    args = parser.parse_args(argv)
+
+    for workers in args.workers:
+        with ReadPool(args.db, size=workers) as pool:
+            jobs = report_jobs(pool) * args.rounds
+            start = time.perf_counter()
+            run_reports(pool, jobs, workers)
+            elapsed = time.perf_counter() - start
+        print(f"{workers} workers: {len(jobs)} reports in {elapsed:.2f}s ({len(jobs) / elapsed:.1f} reports/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+
+from db import DB_PATH, connect
+from repository import AttendanceRepo, ClassRepo, GradeRepo, StudentRepo
+
+FLUSH_BYTES = 1 << 16  # Rendered text collected before each write to the output
+CHUNK_ROWS = 10000  # Rows fetched per keyset page when a whole view is streamed
+FORMATS = ["table", "csv", "jsonl"]
+
+# Views by name: (page function of a connection, column names), for streaming a whole view
+VIEWS = {
+    "students": (lambda conn: StudentRepo(conn).page_with_classes, ["id", "name", "classes"]),
+    "grades": (lambda conn: GradeRepo(conn).page, ["id", "student", "subject", "grade"]),
+    "attendance": (lambda conn: AttendanceRepo(conn).page, ["id", "student", "date", "present"]),
+    "classes": (lambda conn: ClassRepo(conn).page, ["id", "class_name", "grade_level"]),
+}
+
+
+class OutputBuffer:
+    """
+    Collects rendered text in one reusable StringIO and writes it to `out` in blocks of about
+    `flush_bytes`, so output costs one write call per block instead of one per line or field.
+    """
+
+    def __init__(self, out, flush_bytes=FLUSH_BYTES):
+        self.out = out
+        self.flush_bytes = flush_bytes
+        self._buffer = io.StringIO()
+
+    def write(self, text):
+        self._buffer.write(text)
+        if self._buffer.tell() >= self.flush_bytes:
+            self.flush()
+
+    def flush(self):
+        if self._buffer.tell():
+            self.out.write(self._buffer.getvalue())
+            self._buffer.seek(0)
+            self._buffer.truncate()
+
+
+class RowRenderer:
+    """
+    Renders rows under `columns` as an aligned table, CSV or JSON Lines into an OutputBuffer.
+
+    write() may be called once per page or chunk; the header is written once. Table column
+    widths are fixed by the first rows written (longer values later just push their line out),
+    and columns holding only numbers there are right-aligned.
+    """
+
+    def __init__(self, out, columns, fmt="table", flush_bytes=FLUSH_BYTES):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format '{fmt}'; choose one of {', '.join(FORMATS)}.")
+        self.buffer = OutputBuffer(out, flush_bytes)
+        self.columns = columns
+        self.fmt = fmt
+        self.rows = 0
+        self._line = None
+        self._csv = None
+
+    def _start_table(self, rows):
+        cells = [[_cell(value) for value in row] for row in rows]
+        formats, widths = [], []
+        for i, column in enumerate(self.columns):
+            widths.append(max([len(column)] + [len(row[i]) for row in cells]))
+            numeric = bool(rows) and all(isinstance(row[i], (int, float)) for row in rows)
+            formats.append(f"{{!s:{'>' if numeric else '<'}{widths[-1]}}}")
+        if formats[-1].startswith("{!s:<"):  # no trailing padding
+            formats[-1] = "{}"
+        self._line = "  ".join(formats) + "\n"
+        self.buffer.write(self._line.format(*self.columns))
+        self.buffer.write(self._line.format(*("-" * width for width in widths)))
+
+    def write(self, rows):
+        rows = list(rows)
+        if self.fmt == "table":
+            if self._line is None:
+                self._start_table(rows)
+            line = self._line
+            self.buffer.write("".join(line.format(*(map(_cell, row) if None in row else row)) for row in rows))
+        elif self.fmt == "csv":
+            if self._csv is None:
+                self._csv = csv.writer(self.buffer)
+                self._csv.writerow(self.columns)
+            self._csv.writerows(rows)
+        else:
+            columns = self.columns
+            self.buffer.write("".join(json.dumps(dict(zip(columns, row))) + "\n" for row in rows))
+        self.rows += len(rows)
+
+    def close(self):
+        self.buffer.flush()
+
+
+def _cell(value):
+    return "" if value is None else str(value)
+
+
+def write_rows(out, columns, rows, fmt="table"):
+    """
+    Renders `rows` to `out` in one go, e.g. one page of a menu view.
+    """
+    renderer = RowRenderer(out, columns, fmt)
+    renderer.write(rows)
+    renderer.close()
+
+
+def stream_view(conn, name, out, fmt="table", chunk_rows=CHUNK_ROWS):
+    """
+    Writes a whole view to `out`, fetching it in keyset pages of `chunk_rows`. Returns the row count.
+    """
+    page, columns = VIEWS[name]
+    fetch = page(conn)
+    renderer = RowRenderer(out, columns, fmt)
+    rows = fetch(limit=chunk_rows)
+    while rows:
+        renderer.write(rows)
+        rows = fetch(after=rows[-1][0], limit=chunk_rows)
+    renderer.close()
+    return renderer.rows
+
+
+def main(argv=None):
+    """
+    Writes a whole view, e.g. `python render.py grades --format csv > grades.csv`.
+    """
+    parser = argparse.ArgumentParser(description="Print a whole view as an aligned table, CSV or JSON Lines.")
+    parser.add_argument("view", choices=sorted(VIEWS))
+    parser.add_argument("--format", choices=FORMATS, default="table")
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    start = time.perf_counter()
+    rows = stream_view(conn, args.view, sys.stdout, args.format)
+    print(f"{rows} rows in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
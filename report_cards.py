@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from db import DB_PATH, connect
+
+BATCH_SIZE = 500  # Report cards sent to a render worker at a time
+WORKERS = min(os.cpu_count() or 1, 8)  # Render processes; 1 renders in this process
+FORMATS = ["text", "json"]
+
+# The three streams merged into report cards, each ordered by student id so one pass over
+# each index is enough. Grades come straight off idx_grades_student_subject (covering).
+_STUDENTS = """
+    SELECT s.id, s.name, s.registration_date, group_concat(c.class_name, ', ')
+    FROM Students s
+    LEFT JOIN Student_Class sc ON sc.student_id = s.id
+    LEFT JOIN Classes c ON c.id = sc.class_id
+    GROUP BY s.id
+    ORDER BY s.id
+"""
+_GRADES = "SELECT student_id, subject_id, grade FROM Grades ORDER BY student_id, subject_id"
+_ATTENDANCE = "SELECT student_id, count(*), sum(present != 0) FROM Attendance GROUP BY student_id ORDER BY student_id"
+
+_END = (float("inf"),)  # sorts after every student id
+
+
+def report_cards(conn):
+    """
+    Yields one report card dict per student, ordered by id: name, classes, grades and average
+    per subject, overall average and attendance, merged from one ordered pass over each table.
+    """
+    subject_names = dict(conn.execute("SELECT id, name FROM Subjects"))
+    grades = conn.execute(_GRADES)
+    attendance = conn.execute(_ATTENDANCE)
+    grade = next(grades, _END)
+    days = next(attendance, _END)
+    for student_id, name, registered, classes in conn.execute(_STUDENTS):
+        while grade[0] < student_id:  # grades of students that no longer exist
+            grade = next(grades, _END)
+        subjects = []
+        while grade[0] == student_id:
+            subject, marks = grade[1], []
+            while grade[0] == student_id and grade[1] == subject:
+                marks.append(grade[2])
+                grade = next(grades, _END)
+            subjects.append({"subject": subject_names[subject], "grades": marks,
+                             "average": round(sum(marks) / len(marks), 2)})
+        subjects.sort(key=lambda s: s["subject"])
+        while days[0] < student_id:
+            days = next(attendance, _END)
+        recorded, present = days[1:] if days[0] == student_id else (0, 0)
+        count = sum(len(s["grades"]) for s in subjects)
+        yield {
+            "id": student_id, "name": name, "registration_date": registered, "classes": classes,
+            "subjects": subjects,
+            "average": round(sum(sum(s["grades"]) for s in subjects) / count, 2) if count else None,
+            "attendance": {"days": recorded, "present": present, "absent": recorded - present,
+                           "rate": round(present / recorded, 3) if recorded else None},
+        }
+
+
+def render_text(card):
+    lines = [
+        f"REPORT CARD - {card['name']} (student ID {card['id']})",
+        f"Class: {card['classes'] or 'Unassigned'}    Registered: {card['registration_date']}",
+        "",
+    ]
+    if card["subjects"]:
+        lines.append(f"{'Subject':<20}  {'Average':>7}  Grades")
+        lines += [f"{s['subject']:<20}  {s['average']:>7.2f}  {', '.join(map(str, s['grades']))}"
+                  for s in card["subjects"]]
+        lines.append(f"{'Overall':<20}  {card['average']:>7.2f}")
+    else:
+        lines.append("No grades recorded.")
+    attendance = card["attendance"]
+    if attendance["days"]:
+        lines.append(f"\nAttendance: present {attendance['present']} of {attendance['days']} days "
+                     f"({attendance['rate']:.1%}), absent {attendance['absent']}")
+    else:
+        lines.append("\nAttendance: no records.")
+    return "\n".join(lines) + "\n"
+
+
+def render_json(card):
+    return json.dumps(card) + "\n"
+
+
+RENDERERS = {"text": render_text, "json": render_json}
+SEPARATORS = {"text": "\n", "json": ""}  # between cards in a combined document
+
+
+def render_batch(cards, fmt, directory=None):
+    """
+    Renders a batch of cards. With `directory` each card is written to its own file there;
+    otherwise the batch is rendered as one string for a combined document. Returns (cards, text or None).
+    """
+    render = RENDERERS[fmt]
+    if directory is None:
+        return len(cards), SEPARATORS[fmt].join(map(render, cards))
+    extension = "txt" if fmt == "text" else "json"
+    for card in cards:
+        with open(os.path.join(directory, f"student_{card['id']}.{extension}"), "w") as f:
+            f.write(render(card))
+    return len(cards), None
+
+
+def _batches(cards, batch_size):
+    batch = []
+    for card in cards:
+        batch.append(card)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate(conn, fmt="text", output=None, directory=None, workers=WORKERS, batch_size=BATCH_SIZE):
+    """
+    Writes every student's report card to the combined file `output`, or to one file per student
+    in `directory`. Cards are read in one pass and rendered in batches by `workers` processes,
+    with at most two batches per worker in flight. Returns the number of students.
+    """
+    if (output is None) == (directory is None):
+        raise ValueError("Give either an output file or a directory for one file per student.")
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+    out = open(output, "w") if output is not None else None
+    students = 0
+
+    def finish(result):
+        nonlocal students
+        cards, text = result
+        if out is not None:
+            out.write((SEPARATORS[fmt] if students else "") + text)
+        students += cards
+
+    try:
+        batches = _batches(report_cards(conn), batch_size)
+        if workers <= 1:
+            for batch in batches:
+                finish(render_batch(batch, fmt, directory))
+            return students
+        with ProcessPoolExecutor(workers) as pool:
+            pending = deque()
+            for batch in batches:
+                pending.append(pool.submit(render_batch, batch, fmt, directory))
+                if len(pending) >= 2 * workers:
+                    finish(pending.popleft().result())
+            while pending:
+                finish(pending.popleft().result())
+        return students
+    finally:
+        if out is not None:
+            out.close()
+
+
+def main(argv=None):
+    """
+    Writes report cards for every student, e.g. `python report_cards.py --output cards.txt` or `--dir cards`.
+    """
+    parser = argparse.ArgumentParser(description="Report cards (grades, averages, attendance) for every student.")
+    parser.add_argument("--db", default=DB_PATH)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--output", help="one combined file")
+    target.add_argument("--dir", help="directory for one file per student")
+    parser.add_argument("--format", choices=FORMATS, default="text", help="json writes JSON Lines when combined")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="render processes (1 renders in-process)")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    start = time.perf_counter()
+    students = generate(conn, args.format, args.output, args.dir, args.workers)
+    print(f"{students} report cards in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+from functools import partial
+
+from repository import AttendanceRepo, ClassRepo, GradeRepo
+
+
+def grades(conn):
+    return GradeRepo(conn).all()
+
+
+def attendances(conn):
+    return AttendanceRepo(conn).all()
+
+
+def classes(conn):
+    return ClassRepo(conn).all()
+
+
+def students_in_class(conn, class_id):
+    return ClassRepo(conn).roster(class_id)
+
+
+def report_jobs(pool):
+    """
+    One job per report behind the menu (grades, attendances and every class roster),
+    ready for read_pool.run_reports.
+    """
+    with pool.connection() as conn:
+        class_ids = [row[0] for row in classes(conn)]
+    return [grades, attendances] + [partial(students_in_class, class_id=class_id) for class_id in class_ids]
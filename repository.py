@@ -0,0 +1,465 @@
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import date
+
+import lookup_cache
+from dates import ISO_DATE, day_number
+from pager import PAGE_SIZE, fetch_page
+from student_search import SEARCH_LIMIT, search_students
+
+UPSERT_ATTENDANCE = """
+    INSERT INTO Attendance (student_id, date, present) VALUES (?, ?, ?)
+    ON CONFLICT (student_id, date) DO UPDATE SET present = excluded.present
+"""
+
+
+class RepositoryError(Exception):
+    """
+    An operation was rejected; the message is suitable for showing to the user.
+    """
+
+
+class NotFoundError(RepositoryError):
+    pass
+
+
+def _check_date(value):
+    """
+    Normalizes an optional YYYY-MM-DD string (default today), raising RepositoryError if it is malformed.
+    """
+    if not value:
+        return date.today().isoformat()
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise RepositoryError(f"Invalid date '{value}'. Please use YYYY-MM-DD.") from None
+
+
+def _check_range(start, end):
+    """
+    The day numbers (first, last) of the inclusive YYYY-MM-DD range start..end, raising
+    RepositoryError if a date is malformed or the range is empty.
+    """
+    first, last = day_number(_check_date(start)), day_number(_check_date(end))
+    if first > last:
+        raise RepositoryError(f"Invalid range: {start} is after {end}.")
+    return first, last
+
+
+def _in_class(alias, class_id):
+    # Extra condition (and its argument) limiting a query to one class's students
+    if class_id is None:
+        return "", ()
+    return f"AND {alias}.student_id IN (SELECT student_id FROM Student_Class WHERE class_id = ?)", (class_id,)
+
+
+class Repo:
+    """
+    Base class: every repository works on a connection owned by the caller.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    @contextmanager
+    def transaction(self):
+        """
+        Commits the block as one transaction. When the caller already has a transaction open
+        (e.g. a group commit batch) the block runs in a savepoint instead, and the caller commits.
+        """
+        if not self.conn.in_transaction:
+            try:
+                with self.conn:
+                    yield
+            finally:
+                lookup_cache.committed(self.conn)
+            return
+        self.conn.execute("SAVEPOINT repository")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK TO repository")
+            raise
+        finally:
+            self.conn.execute("RELEASE repository")
+
+    def _page(self, select, key, after, before, limit, group_by=''):
+        return fetch_page(self.conn.cursor(), select, key, after=after, before=before, limit=limit, group_by=group_by)
+
+
+class StudentRepo(Repo):
+    def get(self, student_id):
+        """
+        Returns the (id, name, registration_date) row of a student, or None. Cached.
+        """
+        return lookup_cache.cached(lookup_cache.students, self.conn, student_id, lambda: self.conn.execute(
+            "SELECT id, name, registration_date FROM Students WHERE id = ?", (student_id,)).fetchone())
+
+    def require(self, student_id):
+        student = self.get(student_id)
+        if not student:
+            raise NotFoundError(f"Student with ID {student_id} not found.")
+        return student
+
+    def add(self, name, class_name=None):
+        """
+        Adds a student, optionally enrolled in the class called `class_name`. Returns the new id.
+        """
+        with self.transaction():
+            class_id = ClassRepo(self.conn).require_by_name(class_name)[0] if class_name else None
+            student_id = self.conn.execute("INSERT INTO Students (name) VALUES (?)", (name,)).lastrowid
+            if class_id:
+                self.conn.execute("INSERT INTO Student_Class (student_id, class_id) VALUES (?, ?)",
+                                  (student_id, class_id))
+        return student_id
+
+    def page(self, after=None, before=None, limit=PAGE_SIZE):
+        """
+        One page of (id, name, registration_date) rows ordered by id.
+        """
+        return self._page("SELECT id, name, registration_date FROM Students", "id", after, before, limit)
+
+    def page_with_classes(self, after=None, before=None, limit=PAGE_SIZE):
+        """
+        One page of (id, name, class names or None) rows ordered by id.
+        """
+        return self._page("""
+            SELECT s.id, s.name, group_concat(c.class_name, ', ')
+            FROM Students s
+            LEFT JOIN Student_Class sc ON s.id = sc.student_id
+            LEFT JOIN Classes c ON sc.class_id = c.id
+        """, "s.id", after, before, limit, group_by="s.id")
+
+    def search(self, term, limit=SEARCH_LIMIT):
+        """
+        (id, name, class names or None) rows whose name matches `term`, best matches first.
+        """
+        return search_students(self.conn.cursor(), term, limit)
+
+    def rename(self, student_id, name):
+        """
+        Renames a student and returns the previous name.
+        """
+        old_name = self.require(student_id)[1]
+        with self.transaction():
+            self.conn.execute("UPDATE Students SET name = ? WHERE id = ?", (name, student_id))
+        lookup_cache.invalidate(lookup_cache.students, self.conn, student_id)
+        return old_name
+
+    def _require_foreign_keys(self):
+        # Grades, attendance and enrolments are removed by ON DELETE CASCADE, which only runs
+        # with foreign keys on; without it a delete would leave them orphaned
+        if not self.conn.execute("PRAGMA foreign_keys").fetchone()[0]:
+            raise RepositoryError("Deleting students needs PRAGMA foreign_keys = ON (use db.connect).")
+
+    def delete(self, student_id):
+        """
+        Deletes a student; their grades, attendance and class enrolments go with them (ON DELETE CASCADE).
+        """
+        self.require(student_id)
+        self._require_foreign_keys()
+        with self.transaction():
+            self.conn.execute("DELETE FROM Students WHERE id = ?", (student_id,))
+        lookup_cache.invalidate(lookup_cache.students, self.conn, student_id)
+
+    @staticmethod
+    def _selection(ids=None, class_id=None, registration_year=None):
+        conditions, args = [], []
+        if ids is not None:
+            conditions.append("id IN (SELECT value FROM json_each(?))")
+            args.append(json.dumps([int(student_id) for student_id in ids]))
+        if class_id is not None:
+            conditions.append("id IN (SELECT student_id FROM Student_Class WHERE class_id = ?)")
+            args.append(class_id)
+        if registration_year is not None:
+            conditions.append("registration_date >= ? AND registration_date < ?")
+            args += [f"{int(registration_year):04d}-01-01", f"{int(registration_year) + 1:04d}-01-01"]
+        if not conditions:
+            raise RepositoryError("Choose the students to delete: ids, a class or a registration year.")
+        return " AND ".join(conditions), args
+
+    def count_many(self, ids=None, class_id=None, registration_year=None):
+        """
+        The number of students delete_many would delete with the same arguments.
+        """
+        where, args = self._selection(ids, class_id, registration_year)
+        return self.conn.execute(f"SELECT count(*) FROM Students WHERE {where}", args).fetchone()[0]
+
+    def delete_many(self, ids=None, class_id=None, registration_year=None):
+        """
+        Deletes, in one transaction, every student matching all the given filters: an id list,
+        enrolment in a class, and/or registration in a year. Their records cascade. Returns the count.
+        """
+        where, args = self._selection(ids, class_id, registration_year)
+        self._require_foreign_keys()
+        with self.transaction():
+            deleted = self.conn.execute(f"DELETE FROM Students WHERE {where}", args).rowcount
+        lookup_cache.clear(self.conn)
+        return deleted
+
+
+class SubjectRepo(Repo):
+    def find(self, name):
+        """
+        The id of the subject called `name`, or None. Cached.
+        """
+        row = lookup_cache.cached(lookup_cache.subject_ids, self.conn, name, lambda: self.conn.execute(
+            "SELECT id FROM Subjects WHERE name = ?", (name,)).fetchone())
+        return row[0] if row else None
+
+    def resolve(self, name):
+        """
+        The id of the subject called `name` (surrounding spaces ignored), adding it if it is new.
+        """
+        name = name.strip()
+        if not name:
+            raise RepositoryError("Subject name cannot be empty.")
+        subject_id = self.find(name)
+        if subject_id is None:
+            with self.transaction():
+                self.conn.execute("INSERT OR IGNORE INTO Subjects (name) VALUES (?)", (name,))
+                subject_id = self.conn.execute("SELECT id FROM Subjects WHERE name = ?", (name,)).fetchone()[0]
+        return subject_id
+
+    def all(self):
+        """
+        Every (id, name) subject row, ordered by name.
+        """
+        return self.conn.execute("SELECT id, name FROM Subjects ORDER BY name").fetchall()
+
+
+class GradeRepo(Repo):
+    def add(self, student_id, subject, grade):
+        """
+        Records a grade for an existing student; `subject` is a subject name. Returns the new grade id.
+        """
+        StudentRepo(self.conn).require(student_id)
+        subject_id = SubjectRepo(self.conn).resolve(subject)  # before the transaction, so the cache is used
+        with self.transaction():
+            return self.conn.execute("INSERT INTO Grades (student_id, subject_id, grade) VALUES (?, ?, ?)",
+                                     (student_id, subject_id, int(grade))).lastrowid
+
+    def page(self, after=None, before=None, limit=PAGE_SIZE):
+        """
+        One page of (grade id, student name, subject, grade) rows ordered by grade id.
+        """
+        return self._page("""
+            SELECT g.id, s.name, sub.name, g.grade
+            FROM Grades g
+            JOIN Students s ON s.id = g.student_id
+            JOIN Subjects sub ON sub.id = g.subject_id
+        """, "g.id", after, before, limit)
+
+    def all(self):
+        """
+        Every grade as a (grade id, student name, subject, grade) row, ordered by grade id.
+        """
+        return self.conn.execute("""
+            SELECT g.id, s.name, sub.name, g.grade
+            FROM Grades g
+            JOIN Students s ON s.id = g.student_id
+            JOIN Subjects sub ON sub.id = g.subject_id
+            ORDER BY g.id
+        """).fetchall()
+
+    def for_student(self, student_id):
+        """
+        A student's (grade id, subject, grade) rows ordered by subject.
+        """
+        return self.conn.execute("""
+            SELECT g.id, sub.name, g.grade
+            FROM Grades g
+            JOIN Subjects sub ON sub.id = g.subject_id
+            WHERE g.student_id = ?
+            ORDER BY sub.name, g.id
+        """, (student_id,)).fetchall()
+
+    def between(self, start, end, class_id=None):
+        """
+        (date, student id, student name, subject, grade) rows of the grades given from `start` to
+        `end` (YYYY-MM-DD, inclusive), e.g. in one term, optionally only for one class's students.
+        Ordered by date and student, as a range scan of idx_grades_date reads them.
+        """
+        first, last = _check_range(start, end)
+        in_class, args = _in_class("g", class_id)
+        return self.conn.execute(f"""
+            SELECT {ISO_DATE.format('g.date')} AS date, g.student_id, s.name, sub.name AS subject, g.grade
+            FROM Grades g
+            JOIN Students s ON s.id = g.student_id
+            JOIN Subjects sub ON sub.id = g.subject_id
+            WHERE g.date BETWEEN ? AND ? {in_class}
+            ORDER BY g.date, g.student_id, g.id
+        """, (first, last, *args)).fetchall()
+
+    def averages_between(self, start, end, class_id=None):
+        """
+        Per student and subject (student id, student name, subject, grades, average) over the
+        grades given from `start` to `end` (inclusive), ordered by student and subject.
+        """
+        first, last = _check_range(start, end)
+        in_class, args = _in_class("g", class_id)
+        return self.conn.execute(f"""
+            SELECT g.student_id, s.name, sub.name AS subject, count(*) AS grades, round(avg(g.grade), 2) AS average
+            FROM Grades g
+            JOIN Students s ON s.id = g.student_id
+            JOIN Subjects sub ON sub.id = g.subject_id
+            WHERE g.date BETWEEN ? AND ? {in_class}
+            GROUP BY g.student_id, sub.name
+            ORDER BY g.student_id, sub.name
+        """, (first, last, *args)).fetchall()
+
+
+class AttendanceRepo(Repo):
+    def record(self, student_id, present, attendance_date=None):
+        """
+        Records (or overwrites) a student's attendance for a day, today by default. Returns the date used.
+        """
+        attendance_date = _check_date(attendance_date)
+        StudentRepo(self.conn).require(student_id)
+        with self.transaction():
+            self.conn.execute(UPSERT_ATTENDANCE, (student_id, day_number(attendance_date), bool(present)))
+        return attendance_date
+
+    def roll_call(self, class_id, absent_ids, roll_date=None):
+        """
+        Records attendance for a whole class in one transaction: everyone on the roster is marked
+        present except `absent_ids`. Re-running it for the same day overwrites that day's records.
+        Returns (present, absent) counts; ids in `absent_ids` that are not on the roster are ignored.
+        """
+        roll_day = day_number(_check_date(roll_date))
+        absent_ids = set(absent_ids)
+        roster = [row[0] for row in ClassRepo(self.conn).roster(class_id)]
+        rows = [(student_id, roll_day, student_id not in absent_ids) for student_id in roster]
+        with self.transaction():
+            self.conn.executemany(UPSERT_ATTENDANCE, rows)
+        absent = sum(1 for student_id in roster if student_id in absent_ids)
+        return len(roster) - absent, absent
+
+    def page(self, after=None, before=None, limit=PAGE_SIZE):
+        """
+        One page of (attendance id, student name, date, present) rows ordered by attendance id.
+        """
+        return self._page(f"SELECT a.id, s.name, {ISO_DATE.format('a.date')}, a.present "
+                          "FROM Attendance a JOIN Students s ON s.id = a.student_id", "a.id", after, before, limit)
+
+    def all(self):
+        """
+        Every attendance record as an (attendance id, student name, date, present) row, ordered by id.
+        """
+        return self.conn.execute(f"""
+            SELECT a.id, s.name, {ISO_DATE.format('a.date')}, a.present
+            FROM Attendance a
+            JOIN Students s ON s.id = a.student_id
+            ORDER BY a.id
+        """).fetchall()
+
+    def for_student(self, student_id):
+        """
+        A student's (date, present) rows ordered by date.
+        """
+        return self.conn.execute(f"SELECT {ISO_DATE.format('date')}, present FROM Attendance WHERE student_id = ? "
+                                 "ORDER BY date", (student_id,)).fetchall()
+
+    def between(self, start, end, class_id=None):
+        """
+        (date, student id, student name, present) rows from `start` to `end` (YYYY-MM-DD, inclusive),
+        optionally only for one class's students. Ordered by date and student, as a range scan of
+        idx_attendance_date reads them.
+        """
+        first, last = _check_range(start, end)
+        in_class, args = _in_class("a", class_id)
+        return self.conn.execute(f"""
+            SELECT {ISO_DATE.format('a.date')} AS date, a.student_id, s.name, a.present
+            FROM Attendance a
+            JOIN Students s ON s.id = a.student_id
+            WHERE a.date BETWEEN ? AND ? {in_class}
+            ORDER BY a.date, a.student_id
+        """, (first, last, *args)).fetchall()
+
+    def totals_between(self, start, end, class_id=None):
+        """
+        Per student (student id, student name, days recorded, days present) from `start` to `end`
+        (inclusive), ordered by student id.
+        """
+        first, last = _check_range(start, end)
+        in_class, args = _in_class("a", class_id)
+        return self.conn.execute(f"""
+            SELECT a.student_id, s.name, count(*) AS days, sum(a.present != 0) AS present
+            FROM Attendance a
+            JOIN Students s ON s.id = a.student_id
+            WHERE a.date BETWEEN ? AND ? {in_class}
+            GROUP BY a.student_id
+            ORDER BY a.student_id
+        """, (first, last, *args)).fetchall()
+
+
+class ClassRepo(Repo):
+    def add(self, class_name, grade_level):
+        """
+        Adds a class for grade level 1-6. Returns the new class id.
+        """
+        if not 1 <= int(grade_level) <= 6:
+            raise RepositoryError("Invalid grade level. Please enter a number between 1 and 6.")
+        try:
+            with self.transaction():
+                class_id = self.conn.execute("INSERT INTO Classes (class_name, grade_level) VALUES (?, ?)",
+                                             (class_name, int(grade_level))).lastrowid
+        except sqlite3.IntegrityError:
+            raise RepositoryError(f"Class '{class_name}' already exists.") from None
+        lookup_cache.invalidate(lookup_cache.class_list, self.conn, None)
+        return class_id
+
+    def all(self):
+        """
+        Every class as an (id, class_name, grade_level) row, ordered by id. Cached.
+        """
+        return list(lookup_cache.cached(lookup_cache.class_list, self.conn, None, lambda: tuple(
+            self.conn.execute("SELECT id, class_name, grade_level FROM Classes ORDER BY id"))))
+
+    def page(self, after=None, before=None, limit=PAGE_SIZE):
+        return self._page("SELECT id, class_name, grade_level FROM Classes", "id", after, before, limit)
+
+    def require_by_name(self, class_name):
+        row = lookup_cache.cached(lookup_cache.classes_by_name, self.conn, class_name, lambda: self.conn.execute(
+            "SELECT id, class_name, grade_level FROM Classes WHERE class_name = ?", (class_name,)).fetchone())
+        if not row:
+            raise NotFoundError(f"Class '{class_name}' not found.")
+        return row
+
+    def for_student(self, student_id):
+        """
+        The (id, class_name, grade_level) rows of the classes a student is enrolled in.
+        """
+        return self.conn.execute("""
+            SELECT c.id, c.class_name, c.grade_level
+            FROM Student_Class sc
+            JOIN Classes c ON c.id = sc.class_id
+            WHERE sc.student_id = ?
+        """, (student_id,)).fetchall()
+
+    def assign(self, student_id, class_id, replace=False):
+        """
+        Enrolls a student in a class; with replace=True their previous enrolments are removed first.
+        """
+        StudentRepo(self.conn).require(student_id)
+        try:
+            with self.transaction():
+                if replace:
+                    self.conn.execute("DELETE FROM Student_Class WHERE student_id = ?", (student_id,))
+                self.conn.execute("INSERT INTO Student_Class (student_id, class_id) VALUES (?, ?)",
+                                  (student_id, class_id))
+        except sqlite3.IntegrityError:
+            raise NotFoundError(f"Class with ID {class_id} not found.") from None
+
+    def roster(self, class_id):
+        """
+        The (id, name) of every student enrolled in a class, ordered by id.
+        """
+        return self.conn.execute("""
+            SELECT s.id, s.name
+            FROM Student_Class sc
+            JOIN Students s ON s.id = sc.student_id
+            WHERE sc.class_id = ?
+            ORDER BY s.id
+        """, (class_id,)).fetchall()
@@ -0,0 +1,148 @@
+import argparse
+import csv
+import json
+import sys
+import time
+from collections import namedtuple
+from itertools import groupby
+
+from db import DB_PATH, connect
+from render import OutputBuffer
+
+Roster = namedtuple("Roster", "class_id class_name grade_level students")  # students: [(id, name)] by id
+
+# Every class with its students, in one ordered pass over idx_student_class_class
+_ROSTERS = """
+    SELECT c.id, c.class_name, c.grade_level, s.id, s.name
+    FROM Classes c
+    LEFT JOIN Student_Class sc ON sc.class_id = c.id
+    LEFT JOIN Students s ON s.id = sc.student_id
+    {where}
+    ORDER BY c.id, sc.student_id
+"""
+
+
+def rosters(conn, grade_level=None, class_id=None):
+    """
+    Yields a Roster for every class (or the classes of one grade level, or one class), ordered
+    by class id, all read by a single query. Classes without students have an empty list.
+    """
+    conditions, args = [], []
+    if grade_level is not None:
+        conditions.append("c.grade_level = ?")
+        args.append(grade_level)
+    if class_id is not None:
+        conditions.append("c.id = ?")
+        args.append(class_id)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    rows = conn.execute(_ROSTERS.format(where=where), args)
+    for (class_id, class_name, level), members in groupby(rows, key=lambda row: row[:3]):
+        yield Roster(class_id, class_name, level, [(row[3], row[4]) for row in members if row[3] is not None])
+
+
+class LevelTotals:
+    """
+    Class and student counts per grade level, accumulated while the rosters stream past.
+    """
+
+    def __init__(self):
+        self.levels = {}
+
+    def add(self, roster):
+        totals = self.levels.setdefault(roster.grade_level, [0, 0, None, None])
+        size = len(roster.students)
+        totals[0] += 1
+        totals[1] += size
+        totals[2] = size if totals[2] is None else min(totals[2], size)
+        totals[3] = size if totals[3] is None else max(totals[3], size)
+        return roster
+
+    def rows(self):
+        """
+        (grade_level, classes, students, average class size, smallest, largest) rows by level.
+        """
+        return [(level, classes, students, round(students / classes, 1), smallest, largest)
+                for level, (classes, students, smallest, largest) in sorted(self.levels.items())]
+
+
+def render_text(rosters, out, totals, summary=False):
+    for roster in map(totals.add, rosters):
+        heading = (f"{roster.class_name} (grade {roster.grade_level}, class ID {roster.class_id}): "
+                   f"{len(roster.students)} students\n")
+        if summary:
+            out.write(heading)
+        else:
+            out.write("\n" + heading + "".join(f"  {student_id:>8}  {name}\n" for student_id, name in roster.students))
+    if totals.levels:
+        out.write("\nGrade level  Classes  Students  Average size  Smallest  Largest\n")
+        out.write("".join("{:>11}  {:>7}  {:>8}  {:>12}  {:>8}  {:>7}\n".format(*row) for row in totals.rows()))
+
+
+def render_json(rosters, out, totals, summary=False):
+    out.write('{"classes": [')
+    for i, roster in enumerate(rosters):
+        totals.add(roster)
+        record = {"id": roster.class_id, "name": roster.class_name, "grade_level": roster.grade_level,
+                  "size": len(roster.students)}
+        if not summary:
+            record["students"] = [{"id": student_id, "name": name} for student_id, name in roster.students]
+        out.write((", " if i else "") + json.dumps(record))
+    levels = [dict(zip(["grade_level", "classes", "students", "average_size", "smallest", "largest"], row))
+              for row in totals.rows()]
+    out.write(f'], "levels": {json.dumps(levels)}}}\n')
+
+
+def render_csv(rosters, out, totals, summary=False):
+    """
+    One row per enrolment (a class without students gets one row with empty student columns),
+    or with summary=True one row per class with its size. Grade-level totals are left out.
+    """
+    writer = csv.writer(out)
+    if summary:
+        writer.writerow(["class_id", "class_name", "grade_level", "students"])
+        writer.writerows((r.class_id, r.class_name, r.grade_level, len(r.students)) for r in map(totals.add, rosters))
+        return
+    writer.writerow(["class_id", "class_name", "grade_level", "student_id", "student_name"])
+    for roster in map(totals.add, rosters):
+        head = (roster.class_id, roster.class_name, roster.grade_level)
+        writer.writerows([head + student for student in roster.students] or [head + ("", "")])
+
+
+RENDERERS = {"text": render_text, "json": render_json, "csv": render_csv}
+
+
+def render(conn, out, fmt="text", summary=False, grade_level=None, class_id=None):
+    """
+    Writes the roster report for all classes (or one level or class) to `out` in `fmt`, in
+    blocks of render.FLUSH_BYTES rather than a write per line. With summary=True only class sizes and
+    grade-level totals are shown. Returns the LevelTotals.
+    """
+    totals = LevelTotals()
+    buffer = OutputBuffer(out)
+    RENDERERS[fmt](rosters(conn, grade_level, class_id), buffer, totals, summary)
+    buffer.flush()
+    return totals
+
+
+def main(argv=None):
+    """
+    Prints class rosters, sizes and grade-level totals, e.g. `python roster_report.py --format csv > rosters.csv`.
+    """
+    parser = argparse.ArgumentParser(description="Class rosters, class sizes and grade-level breakdown.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--format", choices=sorted(RENDERERS), default="text")
+    parser.add_argument("--summary", action="store_true", help="class sizes and grade-level totals only")
+    parser.add_argument("--level", type=int, help="only classes of this grade level")
+    parser.add_argument("--class-id", type=int, help="only this class")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    start = time.perf_counter()
+    totals = render(conn, sys.stdout, args.format, args.summary, args.level, args.class_id)
+    classes = sum(level[1] for level in totals.rows())
+    print(f"{classes} classes in {(time.perf_counter() - start) * 1000:.1f} ms", file=sys.stderr)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
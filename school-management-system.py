@@ -1,14 +1,20 @@
-import csv
 import sqlite3
+import sys
 from datetime import date
 
+from csv_export import export_query, table_query
+from csv_import import import_csv
+from db import close_connection, get_connection
+from migrations import migrate
+from pager import page_through
+from render import write_rows
+from repository import AttendanceRepo, GradeRepo, RepositoryError, StudentRepo
 
-# Connect to SQLite database
-conn = sqlite3.connect('schooldb.db')
-c = conn.cursor()
 
 def create_tables():
     # Define table creation queries here
+    conn = get_connection()
+    c = conn.cursor()
     c.execute("""
         CREATE TABLE IF NOT EXISTS Students (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -36,6 +42,7 @@ def create_tables():
         )
     """)
     conn.commit()
+    migrate(conn)  # Bring older databases up to the current schema version
     
 create_tables()
 
@@ -55,7 +62,8 @@ def get_user_choice():
     print("10. View Attendances")
     print("11. View Student Attendance")
     print("12. Export Data to CSV")
-    print("13. Quit")
+    print("13. Import Data from CSV")
+    print("14. Quit")
 
     while True:
         try:
@@ -67,28 +75,23 @@ def get_user_choice():
 
 def add_student():
     name = input('Enter student name: ')
-    try:
-        c.execute("INSERT INTO Students (name) VALUES (?)", (name,))
-        conn.commit()
-        print("Student added successfully!")
-    except sqlite3.IntegrityError:
-        print("Error: Student name already exists.")
+    StudentRepo(get_connection()).add(name)
+    print("Student added successfully!")
+
+
+def show_rows(title, columns):
+    def show(rows):
+        print(f"\n{title}:")
+        write_rows(sys.stdout, columns, rows)
+    return show
 
 
 def view_students():
-    c.execute("SELECT * FROM Students")
-    rows = c.fetchall()
-    if not rows:
-        print("No students found.")
-    else:
-        print("\nStudents:")
-        for row in rows:
-            print(row)
+    page_through(StudentRepo(get_connection()).page, show_rows("Students", ["ID", "Name", "Registered"]), empty_message="No students found.")
             
 def search_students():
     search_term = input("Enter student name (or part of the name) to search: ")
-    c.execute(f"SELECT * FROM Students WHERE name LIKE '%{search_term}%'")
-    rows = c.fetchall()
+    rows = StudentRepo(get_connection()).search(search_term)
     if not rows:
         print("No students found matching the search term.")
     else:
@@ -102,24 +105,21 @@ def update_student():
     student_id = int(input("Enter student ID to update: "))
     new_name = input("Enter new student name (leave blank to keep old name): ")
 
-    if new_name:
-        c.execute(f"UPDATE Students SET name = ? WHERE id = {student_id}", (new_name,))
-    else:
-        c.execute(f"SELECT name FROM Students WHERE id = {student_id}")
-        old_name = c.fetchone()[0]  # Get the current name
-
-    conn.commit()
-    if new_name:
-        print(f"Student name updated from '{old_name}' to '{new_name}'.")
-    else:
-        print(f"Student name remains unchanged.")
+    try:
+        if new_name:
+            old_name = StudentRepo(get_connection()).rename(student_id, new_name)
+            print(f"Student name updated from '{old_name}' to '{new_name}'.")
+        else:
+            StudentRepo(get_connection()).require(student_id)
+            print(f"Student name remains unchanged.")
+    except RepositoryError as e:
+        print("Error:", e)
 
 def delete_student():
+    students = StudentRepo(get_connection())
     student_id = int(input("Enter student ID to delete: "))
 
-    # Check if student exists and has any grades/attendance records
-    c.execute(f"SELECT * FROM Students WHERE id = {student_id}")
-    student = c.fetchone()
+    student = students.get(student_id)
     if not student:
         print("Error: Student not found.")
         return
@@ -129,45 +129,36 @@ def delete_student():
         print("Student deletion canceled.")
         return
     
-    # Delete student's grades and attendance records
-    c.execute(f"DELETE FROM Grades WHERE student_id = {student_id}")
-    c.execute(f"DELETE FROM Attendance WHERE student_id = {student_id}")
-    conn.commit()
+    # Delete the student with their grades and attendance records
+    students.delete(student_id)
     print(f"Student '{student[1]}' deleted successfully.")
 
 
 
 def add_grade():
+    conn = get_connection()
     student_id = int(input('Enter student id: '))
     # Ensure student exists before adding grade
-    c.execute(f"SELECT * FROM Students WHERE id = {student_id}")
-    if not c.fetchone():
+    if not StudentRepo(conn).get(student_id):
         print(f"Error: Student with ID {student_id} not found.")
         return
 
     subject = input('Enter subject name: ')
     try:
         grade = int(input('Enter grade (must be a number): '))
-        c.execute("INSERT INTO Grades (student_id, subject, grade) VALUES (?, ?, ?)", (student_id, subject, grade))
-        conn.commit()
+        GradeRepo(conn).add(student_id, subject, grade)
         print("Grade added successfully!")
     except ValueError:
         print("Error: Invalid grade. Please enter a number.")
+    except RepositoryError as e:
+        print(f"Error: {e}")
 
 def view_grades():
-    c.execute("SELECT * FROM Grades")
-    rows = c.fetchall()
-    if not rows:
-        print("No grades found.")
-    else:
-        print("\nGrades:")
-        for row in rows:
-            print(row)
+    page_through(GradeRepo(get_connection()).page, show_rows("Grades", ["ID", "Student", "Subject", "Grade"]), empty_message="No grades found.")
 
 def view_student_grades():
     student_id = int(input('Enter student id: '))
-    c.execute(f"SELECT * FROM Grades WHERE student_id = {student_id}")
-    rows = c.fetchall()
+    rows = GradeRepo(get_connection()).for_student(student_id)
     if not rows:
         print("No grades found for this student.")
     else:
@@ -177,33 +168,25 @@ def view_student_grades():
 
 
 def add_attendance():
+    conn = get_connection()
     student_id = int(input('Enter student id: '))
     # Ensure student exists before adding attendance
-    c.execute(f"SELECT * FROM Students WHERE id = {student_id}")
-    if not c.fetchone():
+    if not StudentRepo(conn).get(student_id):
         print(f"Error: Student with ID {student_id} not found.")
         return
 
     present = input('Is the student present? (yes/no): ').lower() == 'yes'
-    c.execute("INSERT INTO Attendance (student_id, present) VALUES (?, ?)", (student_id, present))
-    conn.commit()
+    # Today's record is overwritten if attendance was already taken
+    AttendanceRepo(conn).record(student_id, present)
     print("Attendance added successfully!")
 
 
 def view_attendances():
-    c.execute("SELECT * FROM Attendance")
-    rows = c.fetchall()
-    if not rows:
-        print("No attendances found.")
-    else:
-        print("\nAttendances:")
-        for row in rows:
-            print(row)
+    page_through(AttendanceRepo(get_connection()).page, show_rows("Attendances", ["ID", "Student", "Date", "Present"]), empty_message="No attendances found.")
 
 def view_student_attendance():
     student_id = int(input('Enter student id: '))
-    c.execute(f"SELECT * FROM Attendance WHERE student_id = {student_id}")
-    rows = c.fetchall()
+    rows = AttendanceRepo(get_connection()).for_student(student_id)
     if not rows:
         print("No attendance records found for this student.")
     else:
@@ -213,32 +196,26 @@ def view_student_attendance():
 
 
 def export_to_csv():
+    c = get_connection().cursor()
     table_name = input("Enter the table name to export (Students, Grades, Attendance): ").lower()
     valid_tables = ["students", "grades", "attendance"]
     if table_name not in valid_tables:
         print("Invalid table name.")
         return
 
-    try:
-        # Construct the query to fetch data
-        query = f"SELECT * FROM {table_name}"
-        c.execute(query)
-        rows = c.fetchall()
-
-        if not rows:
-            print(f"No data found in {table_name} table.")
-            return
+    compress = input("Compress the output with gzip? (yes/no): ").lower() == 'yes'
 
+    try:
         # Generate a filename based on the table name and current date
         today = date.today().strftime("%Y-%m-%d")
         filename = f"{table_name}_{today}.csv"
 
-        with open(filename, 'w', newline='') as csvfile:
-            csv_writer = csv.writer(csvfile)
-            # Write header row
-            csv_writer.writerow([col[0] for col in c.description])  # Get column names
-            # Write data rows
-            csv_writer.writerows(rows)
+        # Stream the table in chunks instead of loading it all with fetchall()
+        filename, rows = export_query(c, table_query(table_name), filename,
+                                      compress=compress, write_empty=False)
+        if not rows:
+            print(f"No data found in {table_name} table.")
+            return
         print(f"Data exported successfully to '{filename}'.")
 
     except sqlite3.Error as e:
@@ -246,6 +223,31 @@ def export_to_csv():
         
         
 
+def import_from_csv():
+    conn = get_connection()
+    table_name = input("Enter the table name to import into (Students, Grades, Attendance): ").lower()
+    valid_tables = ["students", "grades", "attendance"]
+    if table_name not in valid_tables:
+        print("Invalid table name.")
+        return
+    filename = input("Enter the CSV file to import: ")
+    rejects_file = input("Enter a file for rejected rows (optional): ") or None
+
+    try:
+        imported, rejected, seconds = import_csv(conn, table_name, filename, rejects_file=rejects_file)
+    except (OSError, sqlite3.Error) as e:
+        print("Error:", e)
+        return
+
+    print(f"Imported {imported} rows into {table_name} in {seconds:.2f}s.")
+    if rejected:
+        print(f"Rejected {len(rejected)} rows:")
+        for line, reason in rejected[:10]:
+            print(f"  line {line}: {reason}")
+        if len(rejected) > 10:
+            print(f"  ... and {len(rejected) - 10} more")
+
+
 def main():
     create_tables()  # Call this function to create tables if they don't exist
     while True:
@@ -275,8 +277,10 @@ def main():
         elif option == 12:
             export_to_csv()
         elif option == 13:
+            import_from_csv()
+        elif option == 14:
             print("Exiting School Management System.")
-            conn.close()  # Close the database connection
+            close_connection()  # Close this thread's database connection
             break
         else:
             print("Invalid option. Please try again.")
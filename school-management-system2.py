@@ -1,16 +1,25 @@
-import csv
 import sqlite3
-from datetime import date
+import sys
 
+import attendance_analytics
+from csv_export import export_query
+from csv_import import import_csv
+from db import close_connection, get_connection
+import grade_stats
+import report_cards
+import roster_report
+from migrations import migrate
+from pager import page_through
+from render import write_rows
+from repository import AttendanceRepo, ClassRepo, GradeRepo, RepositoryError, StudentRepo
 
-# Connect to SQLite database
-conn = sqlite3.connect('schooldb.db')
-c = conn.cursor()
 
 def create_tables():
   """
   Creates necessary tables for student, grades, attendance, grades scale, and class management.
   """
+  conn = get_connection()
+  c = conn.cursor()
   c.execute("""
     CREATE TABLE IF NOT EXISTS Students (
       id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -56,15 +65,11 @@ def create_tables():
     CREATE TABLE IF NOT EXISTS Student_Class (
       id INTEGER PRIMARY KEY AUTOINCREMENT,
       student_id INTEGER NOT NULL REFERENCES Students(id),
-      class_id INTEGER NOT NULL REFERENCES Classes(id),
-      FOREIGN KEY (student_id, class_id)
-        REFERENCES Students(id, id)
-        ON DELETE CASCADE
-        ON UPDATE CASCADE
-        DEFERRABLE INITIALLY DEFERRED
-        )
+      class_id INTEGER NOT NULL REFERENCES Classes(id)
+    )
   """)
   conn.commit()
+  migrate(conn)  # Bring older databases up to the current schema version
 
 create_tables()
 
@@ -89,8 +94,16 @@ def get_user_choice():
   print("   12.2. View Classes")
   print("   12.3. Assign Student to Class")
   print("   12.4. View Students in a Class")
+  print("   12.5. Take Roll Call")
   print("13. Export Data to CSV")
-  print("14. Quit")
+  print("14. Import Data from CSV")
+  print("15. Reports")
+  print("   15.1. Grade Averages")
+  print("   15.2. Rebuild Grade Averages")
+  print("   15.3. Attendance Analytics")
+  print("   15.4. Class Rosters")
+  print("   15.5. Report Cards")
+  print("16. Quit")
 
   while True:
     try:
@@ -107,49 +120,34 @@ def add_student():
   name = input('Enter student name: ')
   class_name = input('Enter class name (optional): ')
   try:
-    c.execute("INSERT INTO Students (name) VALUES (?)", (name,))
-    conn.commit()
-    print("Student added successfully!")
-    if class_name:
-      # Check if class exists
-      c.execute("SELECT * FROM Classes WHERE class_name = ?", (class_name,))
-      class_row = c.fetchone()
-      if not class_row:
-        print(f"Error: Class '{class_name}' not found.")
-        return
-      class_id = class_row[0]
-      c.execute("INSERT INTO Student_Class (student_id, class_id) VALUES (?, ?)", (student_id, class_id))
-      conn.commit()
-      print(f"Student assigned to class '{class_name}'.")
-  except sqlite3.IntegrityError:
-    print("Error: Student name already exists.")
+    StudentRepo(get_connection()).add(name, class_name or None)
+  except RepositoryError as e:
+    print(f"Error: {e}")
+    return
+  print("Student added successfully!")
+  if class_name:
+    print(f"Student assigned to class '{class_name}'.")
 
 
 def view_students():
   """
-  Retrieves and displays all student information, including their class (if assigned).
+  Displays students one page at a time, including their class (if assigned).
   """
-  c.execute("SELECT s.id, s.name, c.class_name FROM Students s LEFT JOIN Student_Class sc ON s.id = sc.student_id LEFT JOIN Classes c ON sc.class_id = c.id")
-  rows = c.fetchall()
-  if not rows:
-    print("No students found.")
-  else:
+  def show(rows):
     print("\nStudents:")
-    for row in rows:
-      class_name = row[2] if row[2] else "Unassigned"  # Handle students not assigned to a class
-      print(f"Student ID: {row[0]}")
-      print(f"Student Name: {row[1]}")
-      print(f"Class: {class_name}")
-      print("-" * 30)
+    # Students not assigned to a class show as Unassigned
+    write_rows(sys.stdout, ["Student ID", "Student Name", "Class"],
+               ((row[0], row[1], row[2] or "Unassigned") for row in rows))
+
+  page_through(StudentRepo(get_connection()).page_with_classes, show, empty_message="No students found.")
 
 
 def search_students():
   """
-  Searches for students by name and displays their information.
+  Searches for students by name (best matches first) and displays their information.
   """
   search_term = input("Enter student name (or part of the name) to search: ")
-  c.execute(f"SELECT s.id, s.name, c.class_name FROM Students s LEFT JOIN Student_Class sc ON s.id = sc.student_id LEFT JOIN Classes c ON sc.class_id = c.id WHERE s.name LIKE '%{search_term}%'")
-  rows = c.fetchall()
+  rows = StudentRepo(get_connection()).search(search_term)
   if not rows:
     print("No students found matching the search term.")
   else:
@@ -166,52 +164,40 @@ def update_student():
   """
   Allows updating a student's name and optionally their class assignment.
   """
+  conn = get_connection()
+  students = StudentRepo(conn)
   student_id = int(input("Enter student ID to update: "))
   new_name = input("Enter new student name (leave blank to keep old name): ")
 
-  if new_name:
-    c.execute(f"UPDATE Students SET name = ? WHERE id = {student_id}", (new_name,))
-  else:
-    c.execute(f"SELECT name FROM Students WHERE id = {student_id}")
-    old_name = c.fetchone()[0]  # Get the current name
-
-  conn.commit()
-  if new_name:
-    print(f"Student name updated from '{old_name}' to '{new_name}'.")
-  else:
-    print(f"Student name remains unchanged.")
-
-  # Update class assignment (optional)
-  update_class = input("Update class assignment? (yes/no): ").lower() == 'yes'
-  if update_class:
-    new_class_name = input("Enter new class name (leave blank to keep current class): ")
-    if new_class_name:
-      # Check if new class exists
-      c.execute("SELECT * FROM Classes WHERE class_name = ?", (new_class_name,))
-      class_row = c.fetchone()
-      if not class_row:
-        print(f"Error: Class '{new_class_name}' not found.")
-        return
-      new_class_id = class_row[0]
-
-      # Remove student from previous class (if assigned)
-      c.execute("DELETE FROM Student_Class WHERE student_id = ?", (student_id,))
-
-      # Assign student to the new class
-      c.execute("INSERT INTO Student_Class (student_id, class_id) VALUES (?, ?)", (student_id, new_class_id))
-      conn.commit()
-      print(f"Student assigned to class '{new_class_name}'.")
+  try:
+    if new_name:
+      old_name = students.rename(student_id, new_name)
+      print(f"Student name updated from '{old_name}' to '{new_name}'.")
+    else:
+      students.require(student_id)
+      print("Student name remains unchanged.")
+
+    # Update class assignment (optional)
+    update_class = input("Update class assignment? (yes/no): ").lower() == 'yes'
+    if update_class:
+      new_class_name = input("Enter new class name (leave blank to keep current class): ")
+      if new_class_name:
+        classes = ClassRepo(conn)
+        # Replaces the previous class (if assigned)
+        classes.assign(student_id, classes.require_by_name(new_class_name)[0], replace=True)
+        print(f"Student assigned to class '{new_class_name}'.")
+  except RepositoryError as e:
+    print(f"Error: {e}")
 
 
 def delete_student():
   """
   Deletes a student and their associated grades and attendance records.
   """
+  students = StudentRepo(get_connection())
   student_id = int(input("Enter student ID to delete: "))
 
-  # Check if student exists and has any grades/attendance records
-  c.execute(f"SELECT * FROM Students WHERE id = {student_id}")
-  student = c.fetchone()
+  student = students.get(student_id)
   if not student:
     print("Error: Student not found.")
     return
@@ -221,65 +207,39 @@ def delete_student():
     print("Deletion cancelled.")
     return
 
-  # Delete student, grades, and attendance records
-  c.execute("DELETE FROM Attendance WHERE student_id = ?", (student_id,))
-  c.execute("DELETE FROM Grades WHERE student_id = ?", (student_id,))
-  c.execute("DELETE FROM Student_Class WHERE student_id = ?", (student_id,))
-  c.execute("DELETE FROM Students WHERE id = ?", (student_id,))
-  conn.commit()
-
+  students.delete(student_id)
   print("Student deleted successfully.")
 
 
 def add_grade():
   """
-  Prompts for student ID, subject, grade, and checks for valid grade level.
+  Prompts for student ID, subject and grade; the student must be assigned to a class.
   """
+  conn = get_connection()
   student_id = int(input('Enter student ID: '))
-  # ... (existing code to check student existence)
   subject = input('Enter subject name: ')
   grade = int(input('Enter grade (must be a number): '))
-  # Check if grade level exists in Grades_Scale table
-  c.execute("SELECT grade_level FROM Student_Class sc JOIN Classes c ON sc.class_id = c.id WHERE sc.student_id = ?", (student_id,))
-  grade_level_row = c.fetchone()
-  if not grade_level_row:
+  # Classes reference Grades_Scale, so an assigned student always has a valid grade level
+  if not ClassRepo(conn).for_student(student_id):
     print("Error: Student not assigned to a class. Please assign a class first.")
     return
-  grade_level = grade_level_row[0]
-  # Ensure grade is within valid range for the student's grade level
-  c.execute("SELECT * FROM Grades_Scale WHERE grade_level = ?", (grade_level,))
-  if not c.fetchone():
-    print(f"Error: Invalid grade level for student. Please enter a grade between 1 and {grade_level}.")
+  try:
+    GradeRepo(conn).add(student_id, subject, grade)
+  except RepositoryError as e:
+    print(f"Error: {e}")
     return
-
-  c.execute("INSERT INTO Grades (student_id, subject, grade) VALUES (?, ?, ?)", (student_id, subject, grade))
-  conn.commit()
   print("Grade added successfully!")
 
 
 def view_grades():
   """
-  Displays all grades for all students.
+  Displays grades for all students one page at a time.
   """
-  c.execute("""
-    SELECT s.name, su.subject, g.grade
-    FROM Students s
-    JOIN Grades g ON s.id = g.student_id
-    JOIN Classes c ON g.student_id = c.student_id
-    JOIN Student_Class sc ON c.id = sc.class_id
-    JOIN Grades_Scale gs ON c.grade_level = gs.grade_level
-    ORDER BY s.name, gs.grade_level, su.subject
-  """)
-  rows = c.fetchall()
-  if not rows:
-    print("No grades found.")
-  else:
+  def show(rows):
     print("\nAll Grades:")
-    for row in rows:
-      print(f"Student Name: {row[0]}")
-      print(f"Subject: {row[1]}")
-      print(f"Grade: {row[2]}")
-      print("-" * 30)
+    write_rows(sys.stdout, ["Student Name", "Subject", "Grade"], (row[1:] for row in rows))
+
+  page_through(GradeRepo(get_connection()).page, show, empty_message="No grades found.")
 
 
 def view_student_grades():
@@ -287,25 +247,14 @@ def view_student_grades():
   Displays all grades for a specific student.
   """
   student_id = int(input('Enter student ID: '))
-  # ... (existing code to check student existence)
-  c.execute("""
-    SELECT su.subject, g.grade
-    FROM Students s
-    JOIN Grades g ON s.id = g.student_id
-    JOIN Classes c ON g.student_id = c.student_id
-    JOIN Student_Class sc ON c.id = sc.class_id
-    JOIN Grades_Scale gs ON c.grade_level = gs.grade_level
-    WHERE s.id = ?
-    ORDER BY gs.grade_level, su.subject
-  """, (student_id,))
-  rows = c.fetchall()
+  rows = GradeRepo(get_connection()).for_student(student_id)
   if not rows:
     print("No grades found for this student.")
   else:
     print("\nStudent Grades:")
     for row in rows:
-      print(f"Subject: {row[0]}")
-      print(f"Grade: {row[1]}")
+      print(f"Subject: {row[1]}")
+      print(f"Grade: {row[2]}")
       print("-" * 30)
 
 
@@ -314,35 +263,26 @@ def add_attendance():
   Prompts for student ID, date (optional - defaults to current date), and attendance status (present/absent).
   """
   student_id = int(input('Enter student ID: '))
-  # ... (existing code to check student existence)
-  date = input('Enter date (YYYY-MM-DD) (optional, defaults to today): ') or date.today().strftime('%Y-%m-%d')
+  attendance_date = input('Enter date (YYYY-MM-DD) (optional, defaults to today): ')
   present = input('Enter attendance status (present/absent): ').lower() == 'present'
-  c.execute("INSERT INTO Attendance (student_id, date, present) VALUES (?, ?, ?)", (student_id, date, present))
-  conn.commit()
+  try:
+    AttendanceRepo(get_connection()).record(student_id, present, attendance_date)
+  except RepositoryError as e:
+    print(f"Error: {e}")
+    return
   print("Attendance added successfully!")
 
 
 def view_attendances():
   """
-  Displays all attendance records for all students.
+  Displays attendance records for all students one page at a time.
   """
-  c.execute("""
-    SELECT s.name, a.date, a.present
-    FROM Students s
-    JOIN Attendance a ON s.id = a.student_id
-    ORDER BY s.name, a.date
-  """)
-  rows = c.fetchall()
-  if not rows:
-    print("No attendance records found.")
-  else:
+  def show(rows):
     print("\nAll Attendance Records:")
-    for row in rows:
-      presence = "Present" if row[2] else "Absent"
-      print(f"Student Name: {row[0]}")
-      print(f"Date: {row[1]}")
-      print(f"Attendance: {presence}")
-      print("-" * 30)
+    write_rows(sys.stdout, ["Student Name", "Date", "Attendance"],
+               ((row[1], row[2], "Present" if row[3] else "Absent") for row in rows))
+
+  page_through(AttendanceRepo(get_connection()).page, show, empty_message="No attendance records found.")
 
 
 def view_student_attendance():
@@ -350,9 +290,7 @@ def view_student_attendance():
   Displays all attendance records for a specific student.
   """
   student_id = int(input('Enter student ID: '))
-  # ... (existing code to check student existence)
-  c.execute("SELECT date, present FROM Attendance WHERE student_id = ? ORDER BY date", (student_id,))
-  rows = c.fetchall()
+  rows = AttendanceRepo(get_connection()).for_student(student_id)
   if not rows:
     print("No attendance records found for this student.")
   else:
@@ -370,52 +308,56 @@ def add_class():
   """
   class_name = input('Enter class name: ')
   grade_level = int(input('Enter grade level (1-6): '))
-  if grade_level < 1 or grade_level > 6:
-    print("Error: Invalid grade level. Please enter a number between 1 and 6.")
+  try:
+    ClassRepo(get_connection()).add(class_name, grade_level)
+  except RepositoryError as e:
+    print(f"Error: {e}")
     return
-  c.execute("INSERT INTO Classes (class_name, grade_level) VALUES (?, ?)", (class_name, grade_level))
-  conn.commit()
   print("Class added successfully!")
 
 
 def view_classes():
   """
-  Displays all classes.
+  Displays all classes one page at a time.
   """
-  c.execute("SELECT * FROM Classes")
-  rows = c.fetchall()
-  if not rows:
-    print("No classes found.")
-  else:
+  def show(rows):
     print("\nAll Classes:")
-    for row in rows:
-      print(f"Class ID: {row[0]}")
-      print(f"Class Name: {row[1]}")
-      print(f"Grade Level: {row[2]}")
-      print("-" * 30)
+    write_rows(sys.stdout, ["Class ID", "Class Name", "Grade Level"], rows)
 
+  page_through(ClassRepo(get_connection()).page, show, empty_message="No classes found.")
 
-def assign_student_to_class():
+
+def choose_class(classes, action):
   """
-  Assigns a student to a class.
+  Lists `classes` and returns the id of the one the user picks, or None.
   """
-  student_id = int(input('Enter student ID: '))
-  # ... (existing code to check student existence)
-  c.execute("SELECT * FROM Classes")
-  classes = c.fetchall()
   if not classes:
-    print("No classes available to assign students.")
-    return
+    print("No classes found.")
+    return None
   print("\nAvailable Classes:")
   for i, row in enumerate(classes):
     print(f"{i+1}. {row[1]} (Grade {row[2]})")
-  choice = int(input("Enter choice (number) to assign student: ")) - 1
+  choice = int(input(f"Enter choice (number) to {action}: ")) - 1
   if choice < 0 or choice >= len(classes):
     print("Invalid choice.")
+    return None
+  return classes[choice][0]
+
+
+def assign_student_to_class():
+  """
+  Assigns a student to a class.
+  """
+  classes = ClassRepo(get_connection())
+  student_id = int(input('Enter student ID: '))
+  class_id = choose_class(classes.all(), "assign student")
+  if class_id is None:
+    return
+  try:
+    classes.assign(student_id, class_id)
+  except RepositoryError as e:
+    print(f"Error: {e}")
     return
-  class_id = classes[choice][0]
-  c.execute("INSERT INTO Student_Class (student_id, class_id) VALUES (?, ?)", (student_id, class_id))
-  conn.commit()
   print("Student assigned to class successfully!")
 
 
@@ -423,21 +365,11 @@ def view_students_in_class():
   """
   Displays all students enrolled in a specific class.
   """
-  c.execute("SELECT * FROM Classes")
-  classes = c.fetchall()
-  if not classes:
-    print("No classes found.")
+  classes = ClassRepo(get_connection())
+  class_id = choose_class(classes.all(), "view students")
+  if class_id is None:
     return
-  print("\nAvailable Classes:")
-  for i, row in enumerate(classes):
-    print(f"{i+1}. {row[1]} (Grade {row[2]})")
-  choice = int(input("Enter choice (number) to view students: ")) - 1
-  if choice < 0 or choice >= len(classes):
-    print("Invalid choice.")
-    return
-  class_id = classes[choice][0]
-  c.execute("SELECT s.id, s.name FROM Students s JOIN Student_Class sc ON s.id = sc.student_id WHERE sc.class_id = ?", (class_id,))
-  rows = c.fetchall()
+  rows = classes.roster(class_id)
   if not rows:
     print("No students found in this class.")
   else:
@@ -448,27 +380,143 @@ def view_students_in_class():
       print("-" * 30)
 
 
+def roll_call():
+  """
+  Takes attendance for a whole class at once: the clerk only enters the absent students.
+  """
+  conn = get_connection()
+  classes = ClassRepo(conn)
+  class_id = choose_class(classes.all(), "take roll call")
+  if class_id is None:
+    return
+  roster = classes.roster(class_id)
+  if not roster:
+    print("No students found in this class.")
+    return
+
+  roll_date = input('Enter date (YYYY-MM-DD) (optional, defaults to today): ')
+  print("\nRoster:")
+  for row in roster:
+    print(f"{row[0]}. {row[1]}")
+  absent = input("Enter IDs of absent students (comma-separated, blank if none): ")
+  try:
+    absent_ids = [int(student_id) for student_id in absent.replace(',', ' ').split()]
+  except ValueError:
+    print("Error: Invalid student ID.")
+    return
+  try:
+    present_count, absent_count = AttendanceRepo(conn).roll_call(class_id, absent_ids, roll_date)
+  except RepositoryError as e:
+    print(f"Error: {e}")
+    return
+  print(f"Roll call saved: {present_count} present, {absent_count} absent.")
+
+
+def view_grade_averages():
+  """
+  Displays each student's grade count, average, lowest and highest grade from the precomputed aggregates.
+  """
+  rows = grade_stats.student_averages(get_connection())
+  if not rows:
+    print("No grades found.")
+    return
+  print("\nGrade Averages:")
+  for row in rows:
+    print(f"Student ID: {row[0]}")
+    print(f"Student Name: {row[1]}")
+    print(f"Grades: {row[2]}  Average: {row[3]}  Lowest: {row[4]}  Highest: {row[5]}")
+    print("-" * 30)
+
+
+def rebuild_grade_averages():
+  """
+  Recomputes the grade aggregates from the Grades table and reports any drift that was corrected.
+  """
+  drift = grade_stats.rebuild(get_connection())
+  if drift:
+    print(f"Grade averages rebuilt; corrected {len(drift)} out-of-date student/subject totals.")
+  else:
+    print("Grade averages rebuilt; no drift found.")
+
+
+def view_attendance_analytics():
+  """
+  Displays attendance rates per student, class and day, recent absence streaks and chronic absentees.
+  """
+  try:
+    summary = attendance_analytics.summarize(get_connection())
+  except RuntimeError as e:
+    print("Error:", e)
+    return
+  if not summary["records"]:
+    print("No attendance records found.")
+    return
+  attendance_analytics.print_summary(summary)
+
+
+def view_class_rosters():
+  """
+  Displays every class with its students and size, then class counts and sizes per grade level.
+  """
+  totals = roster_report.render(get_connection(), sys.stdout)
+  if not totals.levels:
+    print("No classes found.")
+
+
+def write_report_cards():
+  """
+  Writes every student's report card (grades and averages per subject, attendance) to one text file.
+  """
+  filename = input("Enter the file name for the report cards (default: report_cards.txt): ").strip() or "report_cards.txt"
+  try:
+    students = report_cards.generate(get_connection(), output=filename)
+  except OSError as e:
+    print("Error:", e)
+    return
+  print(f"Wrote {students} report cards to '{filename}'.")
+
+
 def export_data_to_csv():
   """
   Exports all student data (including class information) to a CSV file.
   """
-  data = []
-  c.execute("""
+  c = get_connection().cursor()
+  compress = input("Compress the output with gzip? (yes/no): ").lower() == 'yes'
+  filename, rows = export_query(c, """
     SELECT s.id, s.name, c.class_name
     FROM Students s
     LEFT JOIN Student_Class sc ON s.id = sc.student_id
     LEFT JOIN Classes c ON sc.class_id = c.id
     ORDER BY s.name, c.class_name
-  """)
-  rows = c.fetchall()
-  data.append(["Student ID", "Student Name", "Class"])
-  for row in rows:
-    data.append(list(row))
+  """, 'student_data.csv', header=["Student ID", "Student Name", "Class"], compress=compress)
+  print(f"Student data exported to '{filename}' successfully! ({rows} rows)")
 
-  with open('student_data.csv', 'w', newline='') as csvfile:
-    writer = csv.writer(csvfile)
-    writer.writerows(data)
-  print("Student data exported to 'student_data.csv' successfully!")
+
+def import_data_from_csv():
+  """
+  Bulk loads Students, Grades or Attendance rows from a CSV file in batched transactions.
+  """
+  conn = get_connection()
+  table_name = input("Enter the table name to import into (Students, Grades, Attendance): ").lower()
+  if table_name not in ("students", "grades", "attendance"):
+    print("Invalid table name.")
+    return
+  filename = input("Enter the CSV file to import: ")
+  rejects_file = input("Enter a file for rejected rows (optional): ") or None
+
+  try:
+    imported, rejected, seconds = import_csv(conn, table_name, filename, rejects_file=rejects_file)
+  except (OSError, sqlite3.Error) as e:
+    print("Error:", e)
+    return
+
+  print(f"Imported {imported} rows into {table_name} in {seconds:.2f}s.")
+  if rejected:
+    print(f"Rejected {len(rejected)} rows:")
+    for line, reason in rejected[:10]:
+      print(f"  line {line}: {reason}")
+    if len(rejected) > 10:
+      print(f"  ... and {len(rejected) - 10} more")
 
 
 def main():
@@ -506,6 +554,7 @@ def main():
       print("2. View Classes")
       print("3. Assign Student to Class")
       print("4. View Students in a Class")
+      print("5. Take Roll Call")
       class_management_choice = int(input("Enter choice (number) for class management: "))
       if class_management_choice == 1:
         add_class()
@@ -515,13 +564,38 @@ def main():
         assign_student_to_class()
       elif class_management_choice == 4:
         view_students_in_class()
+      elif class_management_choice == 5:
+        roll_call()
       else:
         print("Invalid choice.")
     elif choice == 13:
       export_data_to_csv()
     elif choice == 14:
+      import_data_from_csv()
+    elif choice == 15:
+      # Report options
+      print("\nReports:")
+      print("1. Grade Averages")
+      print("2. Rebuild Grade Averages")
+      print("3. Attendance Analytics")
+      print("4. Class Rosters")
+      print("5. Report Cards")
+      report_choice = int(input("Enter choice (number) for reports: "))
+      if report_choice == 1:
+        view_grade_averages()
+      elif report_choice == 2:
+        rebuild_grade_averages()
+      elif report_choice == 3:
+        view_attendance_analytics()
+      elif report_choice == 4:
+        view_class_rosters()
+      elif report_choice == 5:
+        write_report_cards()
+      else:
+        print("Invalid choice.")
+    elif choice == 16:
       print("Exiting School Management System...")
-      conn.close()
+      close_connection()
       break
     else:
       print("Invalid choice. Please try again.")
@@ -0,0 +1,457 @@
+"""
+Non-interactive command line for the school management system.
+
+Every command prints its result as JSON Lines (one JSON object per line) on stdout, e.g.
+
+    python sms.py student add "Ada Lovelace" --class 7A
+    python sms.py attendance import attendance.csv
+    python sms.py export grades --gzip
+    python sms.py batch nightly.txt
+
+`batch` runs one command per line of a file (or stdin) in a single process and connection.
+"""
+import argparse
+import json
+import os
+import shlex
+import sqlite3
+import sys
+from datetime import date
+
+import attendance_analytics
+import change_log
+import grade_stats
+import lookup_cache
+import parquet_export
+import roster_report
+from csv_export import export_query, table_query, table_select
+from csv_import import import_csv
+from db import DB_PATH, connect
+from migrations import migrate, schema_version
+from pager import PAGE_SIZE, fetch_page
+from repository import AttendanceRepo, ClassRepo, GradeRepo, RepositoryError, StudentRepo
+from student_search import SEARCH_LIMIT
+
+EXPORT_TABLES = ["students", "grades", "attendance", "classes", "student_class"]
+
+
+def _records(cursor, rows=None):
+    columns = [col[0] for col in cursor.description]
+    return [dict(zip(columns, row)) for row in (cursor.fetchall() if rows is None else rows)]
+
+
+def _page(conn, select, args, key='id'):
+    c = conn.cursor()
+    return _records(c, fetch_page(c, select, key, after=args.after, limit=args.limit))
+
+
+# Students
+
+def student_add(conn, args):
+    student_id = StudentRepo(conn).add(args.name, args.class_name)
+    return [{"ok": True, "id": student_id}]
+
+
+def student_list(conn, args):
+    return _page(conn, "SELECT * FROM Students", args)
+
+
+def student_search(conn, args):
+    rows = StudentRepo(conn).search(args.term, args.limit)
+    return [{"id": row[0], "name": row[1], "class_name": row[2]} for row in rows]
+
+
+def student_update(conn, args):
+    StudentRepo(conn).require(args.id)
+    if args.name:
+        StudentRepo(conn).rename(args.id, args.name)
+    if args.class_name:
+        classes = ClassRepo(conn)
+        classes.assign(args.id, classes.require_by_name(args.class_name)[0], replace=True)
+    return [{"ok": True, "id": args.id}]
+
+
+def student_delete(conn, args):
+    StudentRepo(conn).delete(args.id)
+    return [{"ok": True, "id": args.id}]
+
+
+def student_purge(conn, args):
+    ids = args.ids
+    if args.ids_file:
+        with open(args.ids_file) as f:
+            ids = (ids or []) + [int(line) for line in f if line.strip()]
+    filters = {"ids": ids, "class_id": args.class_id, "registration_year": args.year}
+    students = StudentRepo(conn)
+    if args.dry_run:
+        return [{"ok": True, "would_delete": students.count_many(**filters)}]
+    return [{"ok": True, "deleted": students.delete_many(**filters)}]
+
+
+# Grades
+
+def grade_add(conn, args):
+    grade_id = GradeRepo(conn).add(args.student_id, args.subject, args.grade)
+    return [{"ok": True, "id": grade_id}]
+
+
+def grade_list(conn, args):
+    select, key = table_select("grades")
+    if args.student is not None:
+        c = conn.execute(f"{select} WHERE g.student_id = ? ORDER BY {key}", (args.student,))
+        return _records(c)
+    return _page(conn, select, args, key)
+
+
+def grade_range(conn, args):
+    grades = GradeRepo(conn)
+    if args.summary:
+        rows = grades.averages_between(args.start, args.end, args.class_id)
+        columns = ["student_id", "name", "subject", "grades", "average"]
+    else:
+        rows = grades.between(args.start, args.end, args.class_id)
+        columns = ["date", "student_id", "name", "subject", "grade"]
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def grade_stats_command(conn, args):
+    if args.student is not None:
+        rows = grade_stats.subject_stats(conn, args.student)
+        columns = ["student_id", "subject", "grades", "mean", "min", "max"]
+    else:
+        rows = grade_stats.student_averages(conn)
+        columns = ["student_id", "name", "grades", "mean", "min", "max"]
+    return [dict(zip(columns, row)) for row in rows]
+
+
+# Attendance
+
+def attendance_add(conn, args):
+    attendance_date = AttendanceRepo(conn).record(args.student_id, not args.absent, args.date)
+    return [{"ok": True, "student_id": args.student_id, "date": attendance_date, "present": not args.absent}]
+
+
+def attendance_list(conn, args):
+    select, key = table_select("attendance")
+    if args.student is not None:
+        c = conn.execute(f"{select} WHERE student_id = ? ORDER BY date", (args.student,))
+        return _records(c)
+    return _page(conn, select, args, key)
+
+
+def attendance_range(conn, args):
+    attendance = AttendanceRepo(conn)
+    if args.summary:
+        return [{"student_id": student_id, "name": name, "days": days, "present": present, "absent": days - present}
+                for student_id, name, days, present in attendance.totals_between(args.start, args.end, args.class_id)]
+    return [{"date": day, "student_id": student_id, "name": name, "present": bool(present)}
+            for day, student_id, name, present in attendance.between(args.start, args.end, args.class_id)]
+
+
+def attendance_roll_call(conn, args):
+    present, absent = AttendanceRepo(conn).roll_call(args.class_id, args.absent, args.date)
+    return [{"ok": True, "class_id": args.class_id, "present": present, "absent": absent}]
+
+
+def attendance_analytics_command(conn, args):
+    return [attendance_analytics.summarize(conn, args.window, args.threshold)]
+
+
+# Classes
+
+def class_add(conn, args):
+    class_id = ClassRepo(conn).add(args.name, args.grade_level)
+    return [{"ok": True, "id": class_id}]
+
+
+def class_list(conn, args):
+    return [{"id": row[0], "class_name": row[1], "grade_level": row[2]} for row in ClassRepo(conn).all()]
+
+
+def class_assign(conn, args):
+    ClassRepo(conn).assign(args.student_id, args.class_id)
+    return [{"ok": True, "student_id": args.student_id, "class_id": args.class_id}]
+
+
+def class_roster(conn, args):
+    return [{"id": row[0], "name": row[1]} for row in ClassRepo(conn).roster(args.class_id)]
+
+
+def class_rosters(conn, args):
+    return [{"id": roster.class_id, "name": roster.class_name, "grade_level": roster.grade_level,
+             "size": len(roster.students), "students": [{"id": student_id, "name": name}
+                                                        for student_id, name in roster.students]}
+            for roster in roster_report.rosters(conn, args.level)]
+
+
+# Data files and maintenance
+
+def export_command(conn, args):
+    if args.format == "parquet":
+        return parquet_export_command(conn, args)
+    if args.table not in EXPORT_TABLES:
+        raise ValueError(f"{args.table} can only be exported with --format parquet.")
+    if args.incremental:
+        raise ValueError("--incremental needs --format parquet.")
+    output = args.output or f"{args.table}_{date.today().isoformat()}.csv"
+    filename, rows = export_query(conn.cursor(), table_query(args.table), output,
+                                  compress=args.gzip, progress=None)
+    return [{"ok": True, "table": args.table, "file": filename, "rows": rows}]
+
+
+def parquet_export_command(conn, args):
+    os.makedirs(args.dir, exist_ok=True)
+    if args.incremental:
+        filename, rows = parquet_export.export_incremental(conn, args.table, args.dir, args.state)
+    else:
+        filename = args.output or os.path.join(args.dir, f"{args.table}_{date.today().isoformat()}.parquet")
+        rows, _ = parquet_export.export_parquet(conn, args.table, filename)
+    return [{"ok": True, "table": args.table, "file": filename if rows else None, "rows": rows}]
+
+
+def changes_register(conn, args):
+    return [{"ok": True, "consumer": args.consumer, "seq": change_log.register(conn, args.consumer)}]
+
+
+def changes_export(conn, args):
+    count, seq = change_log.export_changes(conn, args.consumer, args.output)
+    return [{"ok": True, "consumer": args.consumer, "file": args.output, "changes": count, "seq": seq}]
+
+
+def changes_status(conn, args):
+    return [change_log.status(conn)]
+
+
+def changes_prune(conn, args):
+    return [{"ok": True, "deleted": change_log.prune(conn, args.all)}]
+
+
+def import_command(conn, args):
+    imported, rejected, seconds = import_csv(conn, args.table, args.file, rejects_file=args.rejects)
+    results = [{"line": line, "rejected": reason} for line, reason in rejected]
+    results.append({"ok": True, "table": args.table, "imported": imported, "rejected": len(rejected),
+                    "seconds": round(seconds, 3)})
+    return results
+
+
+def migrate_command(conn, args):
+    return [{"ok": True, "schema_version": schema_version(conn)}]
+
+
+def cache_stats_command(conn, args):
+    return [dict(stats, cache=name) for name, stats in lookup_cache.stats().items()]
+
+
+def batch_command(conn, args):
+    """
+    Runs one command per input line on this process's connection, streaming each result as it finishes.
+    """
+    parser = build_parser()
+    source = sys.stdin if args.file == '-' else open(args.file)
+    with source:
+        for line_number, line in enumerate(source, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                command = parser.parse_args(shlex.split(line))
+            except SystemExit:
+                emit({"ok": False, "line": line_number, "error": f"invalid command: {line}"})
+                continue
+            if command.func is batch_command:
+                emit({"ok": False, "line": line_number, "error": "batch cannot be nested"})
+                continue
+            for record in run(conn, command):
+                emit(record)
+    return []
+
+
+def _add_page_arguments(parser):
+    parser.add_argument("--limit", type=int, default=PAGE_SIZE)
+    parser.add_argument("--after", type=int, help="only rows with id greater than this")
+
+
+def _add_range_arguments(parser):
+    parser.add_argument("start", help="first day, YYYY-MM-DD")
+    parser.add_argument("end", help="last day, YYYY-MM-DD (inclusive)")
+    parser.add_argument("--class-id", type=int, help="only this class's students")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="sms", description="School management system command line (JSON Lines output).")
+    parser.add_argument("--db", default=DB_PATH, help="database file (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    student = commands.add_parser("student", help="manage students").add_subparsers(dest="action", required=True)
+    cmd = student.add_parser("add")
+    cmd.add_argument("name")
+    cmd.add_argument("--class", dest="class_name")
+    cmd.set_defaults(func=student_add)
+    cmd = student.add_parser("list")
+    _add_page_arguments(cmd)
+    cmd.set_defaults(func=student_list)
+    cmd = student.add_parser("search")
+    cmd.add_argument("term")
+    cmd.add_argument("--limit", type=int, default=SEARCH_LIMIT)
+    cmd.set_defaults(func=student_search)
+    cmd = student.add_parser("update")
+    cmd.add_argument("id", type=int)
+    cmd.add_argument("--name")
+    cmd.add_argument("--class", dest="class_name")
+    cmd.set_defaults(func=student_update)
+    cmd = student.add_parser("delete")
+    cmd.add_argument("id", type=int)
+    cmd.set_defaults(func=student_delete)
+    cmd = student.add_parser("purge", help="delete many students in one transaction; filters combine")
+    cmd.add_argument("--ids", type=int, nargs="+")
+    cmd.add_argument("--ids-file", help="file with one student id per line")
+    cmd.add_argument("--class-id", type=int, help="students enrolled in this class")
+    cmd.add_argument("--year", type=int, help="students registered in this year")
+    cmd.add_argument("--dry-run", action="store_true", help="only count the students that would be deleted")
+    cmd.set_defaults(func=student_purge)
+    cmd = student.add_parser("import")
+    cmd.add_argument("file")
+    cmd.add_argument("--rejects", help="write rejected rows to this CSV file")
+    cmd.set_defaults(func=import_command, table="students")
+
+    grade = commands.add_parser("grade", help="manage grades").add_subparsers(dest="action", required=True)
+    cmd = grade.add_parser("add")
+    cmd.add_argument("student_id", type=int)
+    cmd.add_argument("subject")
+    cmd.add_argument("grade", type=int)
+    cmd.set_defaults(func=grade_add)
+    cmd = grade.add_parser("list")
+    cmd.add_argument("--student", type=int)
+    _add_page_arguments(cmd)
+    cmd.set_defaults(func=grade_list)
+    cmd = grade.add_parser("range", help="grades given between two dates, e.g. in one term")
+    _add_range_arguments(cmd)
+    cmd.add_argument("--summary", action="store_true", help="count and average per student and subject")
+    cmd.set_defaults(func=grade_range)
+    cmd = grade.add_parser("stats")
+    cmd.add_argument("--student", type=int)
+    cmd.set_defaults(func=grade_stats_command)
+    cmd = grade.add_parser("import")
+    cmd.add_argument("file")
+    cmd.add_argument("--rejects", help="write rejected rows to this CSV file")
+    cmd.set_defaults(func=import_command, table="grades")
+
+    attendance = commands.add_parser("attendance", help="manage attendance").add_subparsers(dest="action", required=True)
+    cmd = attendance.add_parser("add")
+    cmd.add_argument("student_id", type=int)
+    cmd.add_argument("--date", help="YYYY-MM-DD, defaults to today")
+    cmd.add_argument("--absent", action="store_true")
+    cmd.set_defaults(func=attendance_add)
+    cmd = attendance.add_parser("list")
+    cmd.add_argument("--student", type=int)
+    _add_page_arguments(cmd)
+    cmd.set_defaults(func=attendance_list)
+    cmd = attendance.add_parser("range", help="attendance between two dates")
+    _add_range_arguments(cmd)
+    cmd.add_argument("--summary", action="store_true", help="days present and absent per student")
+    cmd.set_defaults(func=attendance_range)
+    cmd = attendance.add_parser("roll-call")
+    cmd.add_argument("class_id", type=int)
+    cmd.add_argument("--absent", type=int, nargs="*", default=[], help="ids of absent students")
+    cmd.add_argument("--date", help="YYYY-MM-DD, defaults to today")
+    cmd.set_defaults(func=attendance_roll_call)
+    cmd = attendance.add_parser("import")
+    cmd.add_argument("file")
+    cmd.add_argument("--rejects", help="write rejected rows to this CSV file")
+    cmd.set_defaults(func=import_command, table="attendance")
+    cmd = attendance.add_parser("analytics")
+    cmd.add_argument("--window", type=int, default=attendance_analytics.STREAK_WINDOW)
+    cmd.add_argument("--threshold", type=float, default=attendance_analytics.CHRONIC_THRESHOLD)
+    cmd.set_defaults(func=attendance_analytics_command)
+
+    classes = commands.add_parser("class", help="manage classes").add_subparsers(dest="action", required=True)
+    cmd = classes.add_parser("add")
+    cmd.add_argument("name")
+    cmd.add_argument("grade_level", type=int)
+    cmd.set_defaults(func=class_add)
+    cmd = classes.add_parser("list")
+    cmd.set_defaults(func=class_list)
+    cmd = classes.add_parser("assign")
+    cmd.add_argument("student_id", type=int)
+    cmd.add_argument("class_id", type=int)
+    cmd.set_defaults(func=class_assign)
+    cmd = classes.add_parser("roster")
+    cmd.add_argument("class_id", type=int)
+    cmd.set_defaults(func=class_roster)
+    cmd = classes.add_parser("rosters", help="every class with its students, from one query")
+    cmd.add_argument("--level", type=int, help="only classes of this grade level")
+    cmd.set_defaults(func=class_rosters)
+
+    cmd = commands.add_parser("export", help="export a table to CSV or Parquet")
+    cmd.add_argument("table", choices=sorted(parquet_export.EXPORTS),
+                     help="student_classes (enrolments joined with students and classes) is Parquet only")
+    cmd.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    cmd.add_argument("--output", help="file name, defaults to <table>_<date>.csv or .parquet")
+    cmd.add_argument("--gzip", action="store_true", help="gzip the CSV file")
+    cmd.add_argument("--incremental", action="store_true",
+                     help="Parquet: only rows added since the last incremental export, into a new file in --dir")
+    cmd.add_argument("--dir", default=".", help="Parquet: output directory")
+    cmd.add_argument("--state", help=f"Parquet: high-water mark file (default: <dir>/{parquet_export.STATE_FILE})")
+    cmd.set_defaults(func=export_command)
+
+    changes = commands.add_parser("changes", help="incremental sync from the change log").add_subparsers(
+        dest="action", required=True)
+    cmd = changes.add_parser("register", help="start a new consumer's cursor now, before its full export")
+    cmd.add_argument("consumer")
+    cmd.set_defaults(func=changes_register)
+    cmd = changes.add_parser("export", help="rows changed since the consumer's last export, as JSON Lines")
+    cmd.add_argument("consumer", help="name of the downstream system; each keeps its own cursor")
+    cmd.add_argument("output", help="JSON Lines file")
+    cmd.set_defaults(func=changes_export)
+    cmd = changes.add_parser("status")
+    cmd.set_defaults(func=changes_status)
+    cmd = changes.add_parser("prune", help="delete log entries every consumer has exported")
+    cmd.add_argument("--all", action="store_true", help="empty the whole log when no consumer is registered")
+    cmd.set_defaults(func=changes_prune)
+
+    cmd = commands.add_parser("import", help="bulk import a CSV file")
+    cmd.add_argument("table", choices=["students", "grades", "attendance"])
+    cmd.add_argument("file")
+    cmd.add_argument("--rejects", help="write rejected rows to this CSV file")
+    cmd.set_defaults(func=import_command)
+
+    cmd = commands.add_parser("migrate", help="upgrade the database schema")
+    cmd.set_defaults(func=migrate_command)
+
+    cmd = commands.add_parser("cache-stats", help="lookup cache hit/miss counters of this process (useful in batch)")
+    cmd.set_defaults(func=cache_stats_command)
+
+    cmd = commands.add_parser("batch", help="run one command per line from a file ('-' for stdin)")
+    cmd.add_argument("file", nargs="?", default="-")
+    cmd.set_defaults(func=batch_command)
+    return parser
+
+
+def emit(record):
+    sys.stdout.write(json.dumps(record, default=str) + "\n")
+
+
+def run(conn, args):
+    """
+    Runs one parsed command and returns its result records; failures become one error record.
+    """
+    try:
+        return args.func(conn, args)
+    except (RepositoryError, ValueError, OSError, RuntimeError, sqlite3.Error) as e:
+        return [{"ok": False, "error": str(e)}]
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    conn = connect(args.db)
+    migrate(conn)
+    ok = True
+    for record in run(conn, args):
+        ok = ok and record.get("ok", True)
+        emit(record)
+    conn.close()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+SEARCH_LIMIT = 50  # Maximum number of students returned per search
+CANDIDATE_LIMIT = 5000  # Substring matches considered for ranking, keeps common terms interactive
+
+_PREFIX_SEARCH = """
+    SELECT id FROM Students
+    WHERE name LIKE ? ESCAPE '\\'
+    ORDER BY name COLLATE NOCASE
+    LIMIT ?
+"""
+
+_SUBSTRING_SEARCH = """
+    SELECT rowid FROM (
+        SELECT rowid, name FROM Students_FTS WHERE Students_FTS MATCH ? LIMIT ?
+    )
+    ORDER BY instr(lower(name), lower(?)), length(name), name
+    LIMIT ?
+"""
+
+_FUZZY_SEARCH = """
+    SELECT rowid FROM Students_FTS WHERE Students_FTS MATCH ? ORDER BY rank LIMIT ?
+"""
+
+
+def _like_prefix(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def _phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _trigrams(term):
+    term = term.lower()
+    return sorted({term[i:i + 3] for i in range(len(term) - 2)})
+
+
+def _student_rows(cursor, ids):
+    if not ids:
+        return []
+    position = {student_id: i for i, student_id in enumerate(ids)}
+    cursor.execute(f"""
+        SELECT s.id, s.name, group_concat(c.class_name, ', ')
+        FROM Students s
+        LEFT JOIN Student_Class sc ON s.id = sc.student_id
+        LEFT JOIN Classes c ON sc.class_id = c.id
+        WHERE s.id IN ({', '.join('?' * len(ids))})
+        GROUP BY s.id
+    """, ids)
+    return sorted(cursor.fetchall(), key=lambda row: position[row[0]])
+
+
+def search_students(cursor, term, limit=SEARCH_LIMIT, fuzzy=True):
+    """
+    Searches student names and returns (id, name, class names) rows, one per student, best matches first.
+
+    Names starting with the term come first (a range scan on the name index), followed by
+    names containing it anywhere (the trigram index), closest match position and shortest
+    name first. If nothing contains the term and fuzzy is set, names sharing the most
+    trigrams with it are returned by FTS5 rank, so small typos still find the student.
+    Terms shorter than three characters only do the prefix match.
+    """
+    term = term.strip()
+    if not term:
+        return []
+
+    cursor.execute(_PREFIX_SEARCH, (_like_prefix(term), limit))
+    ids = [row[0] for row in cursor.fetchall()]
+    if len(term) < 3 or len(ids) >= limit:
+        return _student_rows(cursor, ids)
+
+    cursor.execute(_SUBSTRING_SEARCH, (_phrase(term), CANDIDATE_LIMIT, term, limit + len(ids)))
+    seen = set(ids)
+    for (student_id,) in cursor.fetchall():
+        if student_id not in seen and len(ids) < limit:
+            ids.append(student_id)
+            seen.add(student_id)
+
+    if not ids and fuzzy:
+        any_trigram = ' OR '.join(_phrase(trigram) for trigram in _trigrams(term))
+        cursor.execute(_FUZZY_SEARCH, (any_trigram, limit))
+        ids = [row[0] for row in cursor.fetchall()]
+    return _student_rows(cursor, ids)
@@ -0,0 +1,33 @@
+import pytest
+
+import change_log
+from db import connect
+from migrations import migrate
+from repository import StudentRepo
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = connect(str(tmp_path / "school.db"))
+    migrate(conn)
+    yield conn
+    conn.close()
+
+
+def test_prune_keeps_changes_made_after_register(conn, tmp_path):
+    StudentRepo(conn).add("Before")
+    with pytest.raises(ValueError):
+        change_log.prune(conn)
+
+    change_log.register(conn, "warehouse")
+    StudentRepo(conn).add("After")
+    change_log.prune(conn)
+
+    output = tmp_path / "changes.jsonl"
+    assert change_log.export_changes(conn, "warehouse", str(output))[0] == 1
+    assert '"name": "After"' in output.read_text()
+
+
+def test_prune_all_empties_an_unread_log(conn):
+    StudentRepo(conn).add("Ada")
+    assert change_log.prune(conn, everything=True) == 1
@@ -0,0 +1,42 @@
+import threading
+
+from db import connect
+from group_commit import GroupCommitWriter
+from migrations import migrate
+from repository import StudentRepo
+
+
+def _database(tmp_path):
+    path = str(tmp_path / "school.db")
+    conn = connect(path)
+    migrate(conn)
+    conn.close()
+    return path
+
+
+def test_cancelled_queued_write_is_skipped(tmp_path):
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_write(conn):
+        started.set()
+        release.wait(10)
+        return StudentRepo(conn).add("First")
+
+    with GroupCommitWriter(_database(tmp_path)) as writer:
+        first = writer.submit(blocking_write)
+        assert started.wait(10)
+        # Queued behind the running batch, so still cancellable
+        cancelled = writer.submit(lambda conn: StudentRepo(conn).add("Cancelled"))
+        assert cancelled.cancel()
+        queued = writer.submit(lambda conn: StudentRepo(conn).add("Queued"))
+        release.set()
+
+        assert first.result(10)
+        assert queued.result(10)
+        assert writer.write(lambda conn: StudentRepo(conn).add("Later"))
+        assert writer.stats()["cancelled"] == 1
+
+    conn = connect(writer.path)
+    names = [name for name, in conn.execute("SELECT name FROM Students ORDER BY id")]
+    conn.close()
+    assert names == ["First", "Queued", "Later"]
@@ -0,0 +1,31 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+import db
+from repository import StudentRepo
+
+
+@pytest.fixture
+def menu(tmp_path, monkeypatch):
+    # The menu creates its tables on import, so point it at a scratch database first
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "school.db"))
+    path = Path(__file__).parent / "school-management-system.py"
+    spec = importlib.util.spec_from_file_location("school_management_system", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    yield module
+    db.close_connection()
+
+
+def test_add_grade_reports_blank_subject(menu, monkeypatch, capsys):
+    conn = db.get_connection()
+    student_id = StudentRepo(conn).add("Ada")
+    answers = iter([str(student_id), "   ", "5"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+
+    menu.add_grade()
+
+    assert "Error: Subject name cannot be empty." in capsys.readouterr().out
+    assert conn.execute("SELECT count(*) FROM Grades").fetchone() == (0,)
@@ -0,0 +1,51 @@
+import pytest
+
+import migrations
+from db import connect
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = connect(str(tmp_path / "school.db"))
+    yield conn
+    conn.close()
+
+
+def _migrate_to(conn, monkeypatch, version):
+    with monkeypatch.context() as patch:
+        patch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS[:version])
+        patch.setattr(migrations, "SCHEMA_VERSION", version)
+        migrations.migrate(conn)
+
+
+@pytest.mark.parametrize("stored", ["2024", "now", "2024-02-30"])
+def test_day_numbers_quarantine_dates_that_are_not_strict(conn, monkeypatch, stored):
+    _migrate_to(conn, monkeypatch, 9)
+    student_id = conn.execute("INSERT INTO Students (name) VALUES ('Ada')").lastrowid
+    subject_id = conn.execute("INSERT INTO Subjects (name) VALUES ('Math')").lastrowid
+    conn.executemany("INSERT INTO Attendance (student_id, date, present) VALUES (?, ?, 1)",
+                     [(student_id, "2024-01-05"), (student_id, stored)])
+    conn.executemany("INSERT INTO Grades (student_id, subject_id, grade, date) VALUES (?, ?, 5, ?)",
+                     [(student_id, subject_id, "2024-01-05"), (student_id, subject_id, stored)])
+    conn.commit()
+
+    assert migrations.migrate(conn) == 10
+    assert conn.execute("SELECT date FROM Attendance").fetchall() == [(19727,)]
+    assert conn.execute("SELECT date FROM Grades").fetchall() == [(19727,)]
+    assert conn.execute("SELECT date, reason FROM Quarantined_Attendance").fetchall() == \
+        [(stored, "not a YYYY-MM-DD date")]
+    assert conn.execute("SELECT date, reason FROM Quarantined_Grades").fetchall() == \
+        [(stored, "not a YYYY-MM-DD date")]
+
+
+def test_unique_daily_attendance_quarantines_older_duplicates(conn, monkeypatch):
+    _migrate_to(conn, monkeypatch, 4)
+    student_id = conn.execute("INSERT INTO Students (name) VALUES ('Ada')").lastrowid
+    conn.executemany("INSERT INTO Attendance (student_id, date, present) VALUES (?, '2024-01-05', ?)",
+                     [(student_id, 1), (student_id, 0)])
+    conn.commit()
+
+    _migrate_to(conn, monkeypatch, 5)
+    assert conn.execute("SELECT present FROM Attendance").fetchall() == [(0,)]
+    assert conn.execute("SELECT present, reason FROM Quarantined_Attendance").fetchall() == \
+        [(1, "duplicate daily record")]
@@ -0,0 +1,26 @@
+import pytest
+
+from db import connect
+from migrations import migrate
+from repository import ClassRepo, StudentRepo
+from student_search import search_students
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = connect(str(tmp_path / "school.db"))
+    migrate(conn)
+    yield conn
+    conn.close()
+
+
+def test_student_in_two_classes_is_one_row(conn):
+    classes = ClassRepo(conn)
+    ada = StudentRepo(conn).add("Ada Lovelace")
+    for class_name in ("7A", "Chess club"):
+        classes.assign(ada, classes.add(class_name, 1))
+    byron = StudentRepo(conn).add("Ada Byron")
+
+    rows = search_students(conn.cursor(), "Ada", limit=2)
+    assert sorted(row[0] for row in rows) == [ada, byron]
+    assert sorted(next(row for row in rows if row[0] == ada)[2].split(", ")) == ["7A", "Chess club"]